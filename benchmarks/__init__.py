@@ -0,0 +1,22 @@
+'''
+Benchmarks for the grammar algorithms.
+
+Each module can be run on its own, e.g.:
+    python -m benchmarks.index
+'''
+from timeit import default_timer
+
+
+def measure(fun, repeat=3, setup=None):
+    '''
+    Returns the best time, in seconds, of `repeat` calls to `fun`. If given,
+    `setup` is called, without being timed, before each call.
+    '''
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = default_timer()
+        fun()
+        best = min(best, default_timer() - start)
+    return best
@@ -0,0 +1,35 @@
+'''
+Compares opening large grammars from the text format and from the binary
+format.
+'''
+import os
+import tempfile
+
+from grammar import Grammar
+from grammar.loader import load_file
+from benchmarks import measure
+from benchmarks.generate import random_grammar
+
+
+def main():
+    print(f'{"size":>6} {"prods":>7} {"text":>9} {"binary":>9} {"speedup":>8}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, 'grammar.txt')
+        binary_path = os.path.join(directory, 'grammar.bin')
+
+        for size in (1000, 10000, 50000):
+            grammar = random_grammar(size, terminals=100, length=8, seed=size)
+            with open(text_path, 'w') as file:
+                file.write(str(grammar))
+            grammar.save_binary(binary_path)
+
+            text_time = measure(lambda: load_file(text_path), repeat=1)
+            binary_time = measure(lambda: Grammar.load_binary(binary_path))
+            print(f'{size:>6} {len(grammar.productions):>7} '
+                  f'{text_time:>9.4f} {binary_time:>9.4f} '
+                  f'{text_time / binary_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+'''
+Compares the FIRST and FOLLOW sets stored as sets of terminals against the
+int bitmasks of `Grammar.bitsets`, on grammars with thousands of terminals.
+'''
+from benchmarks import measure
+from benchmarks.generate import random_grammar
+
+
+def main():
+    print(f'{"terms":>6} {"prods":>7} {"sets":>9} {"bitsets":>9} '
+          f'{"speedup":>8} {"to sets":>9}')
+
+    for terminals in (1000, 2000, 4000, 8000):
+        grammar = random_grammar(
+            1000, terminals=terminals, epsilon=0.3, seed=terminals)
+
+        def sets():
+            grammar.first_sets()
+            grammar.follow_sets()
+
+        def to_sets():
+            bitsets = grammar.bitsets()
+            bitsets.first_sets()
+            bitsets.follow_sets()
+
+        sets_time = measure(sets, setup=grammar.cache_clear)
+        bitsets_time = measure(grammar.bitsets, setup=grammar.cache_clear)
+        to_sets_time = measure(to_sets, setup=grammar.cache_clear)
+        print(f'{terminals:>6} {len(grammar.productions):>7} '
+              f'{sets_time:>9.4f} {bitsets_time:>9.4f} '
+              f'{sets_time / bitsets_time:>7.1f}x {to_sets_time:>9.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+'''
+Times the main analyses of a fresh grammar, like a new process would, without
+a disk cache, with an empty one (cold) and with one that already has the
+results (warm).
+
+`is_finite` makes the grammar proper, which can grow it quadratically, so it
+is timed alone on smaller grammars.
+'''
+import os
+import tempfile
+
+from grammar import DiskCache, Grammar
+from benchmarks import measure
+from benchmarks.generate import random_grammar
+
+
+def analyses(grammar):
+    grammar.first_sets()
+    grammar.follow_sets()
+    grammar.has_left_recursion()
+    grammar.is_factored()
+
+
+def finiteness(grammar):
+    grammar.is_finite()
+
+
+def analyze(grammar, cache, fun):
+    # A new grammar has nothing cached in memory, as after a restart
+    grammar = Grammar(
+        grammar.non_terminals,
+        grammar.terminals,
+        grammar.productions,
+        grammar.start)
+    grammar.disk_cache = cache
+    fun(grammar)
+
+
+def main():
+    print(f'{"":>10} {"size":>6} {"prods":>7} {"none":>9} {"cold":>9} '
+          f'{"warm":>9} {"speedup":>8}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DiskCache(os.path.join(directory, 'analysis.db'))
+        runs = [
+            (analyses, (1000, 5000, 20000)),
+            (finiteness, (50, 100, 150)),
+        ]
+        for fun, sizes in runs:
+            for size in sizes:
+                grammar = random_grammar(size, epsilon=0.3, seed=size)
+
+                none_time = measure(lambda: analyze(grammar, None, fun))
+                cold_time = measure(
+                    lambda: analyze(grammar, cache, fun),
+                    setup=cache.clear)
+                warm_time = measure(lambda: analyze(grammar, cache, fun))
+                print(f'{fun.__name__:>10} {size:>6} '
+                      f'{len(grammar.productions):>7} {none_time:>9.4f} '
+                      f'{cold_time:>9.4f} {warm_time:>9.4f} '
+                      f'{none_time / warm_time:>7.1f}x')
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+'''
+Compares the output size and time of `remove_epsilon` with and without
+binarization, on grammars with a long production of nullable symbols.
+'''
+from grammar import Grammar, Prod
+from benchmarks import measure
+
+# The exponential strategy is not run past this many nullable positions
+EXPANSION_LIMIT = 16
+
+
+def nullable_grammar(positions):
+    '''
+    Generates S -> A0 A1 ... An, with Ai -> ai | EPSILON.
+    '''
+    non_terminals = [ f'A{i}' for i in range(positions) ]
+    terminals = [ f'a{i}' for i in range(positions) ]
+    productions = { Prod('S', tuple(non_terminals)) }
+    for nt, t in zip(non_terminals, terminals):
+        productions.add(Prod(nt, (t,)))
+        productions.add(Prod(nt, (Grammar.EPSILON,)))
+
+    return Grammar(
+        set(non_terminals) | { 'S' },
+        set(terminals),
+        productions,
+        'S')
+
+
+def run(positions, binarize):
+    grammar = nullable_grammar(positions)
+    time = measure(
+        lambda: grammar.remove_epsilon(binarize),
+        repeat=1)
+    return len(grammar.productions), time
+
+
+def main():
+    print(f'{"nullable":>8} {"expand":>8} {"time":>9} {"binarize":>9} '
+          f'{"time":>9}')
+
+    for positions in (4, 8, 12, 16, 20, 100, 1000):
+        if positions <= EXPANSION_LIMIT:
+            size, time = run(positions, False)
+            expand = f'{size:>8} {time:>9.4f}'
+        else:
+            expand = f'{"-":>8} {"-":>9}'
+
+        size, time = run(positions, True)
+        print(f'{positions:>8} {expand} {size:>9} {time:>9.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+'''
+Compares `factor`, which pairs the productions of each non terminal by
+their first sets and factors one group per step, against the prefix trie
+engine of `left_factor`, on non terminals with thousands of alternatives.
+'''
+from copy import deepcopy
+
+from grammar import Grammar, Prod
+from benchmarks import measure
+
+# `factor` is not run past this many alternatives
+PAIRWISE_LIMIT = 2000
+
+
+def alternatives_grammar(size):
+    '''
+    Generates `size` alternatives S -> t_i t_j over size / 2 terminals, so
+    the alternatives come in pairs that share their first symbol.
+    '''
+    terminals = size // 2
+    terminal_list = [ f't{i}' for i in range(terminals) ]
+    productions = set()
+    for k in range(size):
+        body = (
+            terminal_list[k % terminals],
+            terminal_list[k // terminals])
+        productions.add(Prod('S', body))
+
+    return Grammar({ 'S' }, set(terminal_list), productions, 'S')
+
+
+def main():
+    print(f'{"alts":>6} {"factor":>9} {"trie":>9} {"rounds":>7} '
+          f'{"new":>6}')
+
+    for size in (250, 500, 1000, 2000, 4000, 8000):
+        grammar = alternatives_grammar(size)
+
+        if size <= PAIRWISE_LIMIT:
+            pairwise = measure(lambda: grammar.factor(size), repeat=1)
+            pairwise = f'{pairwise:>9.4f}'
+        else:
+            pairwise = f'{"-":>9}'
+
+        result = None
+
+        def trie():
+            nonlocal result
+            result = deepcopy(grammar).left_factor()
+
+        trie_time = measure(trie, repeat=1)
+        print(f'{size:>6} {pairwise} {trie_time:>9.4f} {result.rounds:>7} '
+              f'{len(result.new_symbols):>6}')
+
+
+if __name__ == '__main__':
+    main()
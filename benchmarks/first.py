@@ -0,0 +1,24 @@
+'''
+Compares the SCC based FIRST engine against the old fixpoint that deep
+copied the FIRST sets on every round.
+'''
+from benchmarks import legacy, measure
+from benchmarks.generate import random_grammar
+
+
+def main():
+    print(f'{"size":>6} {"prods":>7} {"fixpoint":>9} {"scc":>9} '
+          f'{"speedup":>8}')
+
+    for size in (50, 100, 200, 400, 800):
+        grammar = random_grammar(size, epsilon=0.3, seed=size)
+
+        fixpoint_time = measure(lambda: legacy.first_sets(grammar))
+        scc_time = measure(grammar.first_sets, setup=grammar.cache_clear)
+        print(f'{size:>6} {len(grammar.productions):>7} '
+              f'{fixpoint_time:>9.4f} {scc_time:>9.4f} '
+              f'{fixpoint_time / scc_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
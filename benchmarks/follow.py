@@ -0,0 +1,32 @@
+'''
+Compares the FOLLOW engine against the old fixpoint, then times the engine
+alone on a grammar with about 100k productions.
+'''
+from benchmarks import legacy, measure
+from benchmarks.generate import random_grammar
+
+
+def main():
+    print(f'{"size":>6} {"prods":>7} {"fixpoint":>9} {"engine":>9} '
+          f'{"speedup":>8}')
+
+    for size in (50, 100, 200, 400):
+        grammar = random_grammar(size, epsilon=0.3, seed=size)
+
+        fixpoint_time = measure(lambda: legacy.follow_sets(grammar))
+        engine_time = measure(grammar.follow_sets, setup=grammar.cache_clear)
+        print(f'{size:>6} {len(grammar.productions):>7} '
+              f'{fixpoint_time:>9.4f} {engine_time:>9.4f} '
+              f'{fixpoint_time / engine_time:>7.1f}x')
+
+    grammar = random_grammar(34000, terminals=50, epsilon=0.3, seed=1)
+    engine_time = measure(
+        grammar.follow_sets,
+        repeat=1,
+        setup=grammar.cache_clear)
+    print(f'{34000:>6} {len(grammar.productions):>7} {"-":>9} '
+          f'{engine_time:>9.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import random
+
+from grammar import Grammar, Prod
+
+
+def random_grammar(size, terminals=10, alternatives=3, length=4,
+                   epsilon=0.1, seed=0):
+    '''
+    Generates a random grammar with `size` non terminals.
+
+    Each non terminal gets `alternatives` productions of up to `length`
+    symbols and, with probability `epsilon`, an extra epsilon production.
+    Non terminals are named A0, A1, ... and terminals t0, t1, ...
+    '''
+    rand = random.Random(seed)
+
+    non_terminals = [ f'A{i}' for i in range(size) ]
+    terminal_list = [ f't{i}' for i in range(terminals) ]
+    symbols = non_terminals + terminal_list
+
+    productions = set()
+    for nt in non_terminals:
+        # Makes sure every non terminal is productive
+        productions.add(Prod(nt, (rand.choice(terminal_list),)))
+
+        for _ in range(alternatives - 1):
+            prod_len = rand.randint(1, length)
+            prod = tuple(rand.choice(symbols) for _ in range(prod_len))
+            productions.add(Prod(nt, prod))
+
+        if rand.random() < epsilon:
+            productions.add(Prod(nt, (Grammar.EPSILON,)))
+
+    return Grammar(
+        set(non_terminals),
+        set(terminal_list),
+        productions,
+        non_terminals[0])
@@ -0,0 +1,43 @@
+'''
+Compares the fixpoint FIRST and FOLLOW algorithms, which look up the
+productions of a non terminal on every round, with the per non terminal
+production index against the old linear scan done by `Grammar.__getitem__`.
+'''
+from grammar import Grammar
+from benchmarks import legacy, measure
+from benchmarks.generate import random_grammar
+
+
+class ScanGrammar(Grammar):
+    '''
+    Grammar that looks up productions by scanning every production, as it
+    was done before the index existed.
+    '''
+
+    def __getitem__(self, nt):
+        return { p for n, p in self.productions if n == nt }
+
+
+def main():
+    print(f'{"size":>6} {"prods":>7} {"op":>7} {"scan":>9} {"index":>9} '
+          f'{"speedup":>8}')
+
+    for size in (25, 50, 100, 200, 400):
+        grammar = random_grammar(size, seed=size)
+        scan = ScanGrammar(
+            grammar.non_terminals,
+            grammar.terminals,
+            grammar.productions,
+            grammar.start)
+
+        for op in ('first_sets', 'follow_sets'):
+            fun = getattr(legacy, op)
+            scan_time = measure(lambda: fun(scan))
+            index_time = measure(lambda: fun(grammar))
+            print(f'{size:>6} {len(grammar.productions):>7} {op[:-5]:>7} '
+                  f'{scan_time:>9.4f} {index_time:>9.4f} '
+                  f'{scan_time / index_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+'''
+The fixpoint algorithms used before the current engines, kept only to
+compare them in the benchmarks.
+'''
+from collections import defaultdict
+from copy import deepcopy
+
+from grammar import Grammar
+
+
+def first_sequence(grammar, first, sequence):
+    first_set = set()
+    seq = list(sequence)
+    while seq:
+        symbol = seq.pop(0)
+
+        if symbol in grammar.terminals | { Grammar.EPSILON }:
+            first_set.add(symbol)
+            break
+
+        first_set |= first[symbol]
+        first_set.add(symbol)
+        if Grammar.EPSILON not in first[symbol]:
+            break
+
+        if seq:
+            first_set.discard(Grammar.EPSILON)
+
+    return first_set
+
+
+def first(grammar):
+    first_dict = defaultdict(set)
+    # Rule 1
+    for symbol in grammar.terminals:
+        first_dict[symbol].add(symbol)
+
+    while True:
+        new_dict = deepcopy(first_dict)
+
+        for symbol in grammar.non_terminals:
+            productions = grammar[symbol]
+
+            # Rule 2
+            to_discard = set()
+            for prod in productions:
+                first = prod[0]
+                if first in grammar.terminals:
+                    new_dict[symbol].add(first)
+                    to_discard.add(prod)
+            productions -= to_discard
+
+            # Rule 3
+            for prod in productions:
+                first_seq = first_sequence(grammar, new_dict, prod)
+                new_dict[symbol] |= first_seq
+
+        if new_dict == first_dict:
+            break
+
+        first_dict = new_dict
+
+    return dict(first_dict)
+
+
+def first_sets(grammar):
+    first_dict = first(grammar)
+    for val in first_dict.values():
+        val -= grammar.non_terminals
+    return first_dict
+
+
+def follow_sets(grammar):
+    follow = defaultdict(set)
+    first = first_sets(grammar)
+
+    while True:
+        new_follow = deepcopy(follow)
+
+        for nt in grammar.non_terminals:
+
+            # Rule 1
+            if nt == grammar.start:
+                new_follow[nt].add(Grammar.FINISH)
+
+            productions = grammar[nt]
+
+            # Rule 2
+            for prod in productions:
+                seq = list(prod)
+                while seq:
+                    symbol = seq.pop(0)
+                    # Go until the second-to-last symbol
+                    if not seq:
+                        break
+
+                    if symbol in grammar.terminals:
+                        continue
+
+                    seq_first = first_sequence(grammar, first, seq)
+                    new_follow[symbol] |= seq_first - grammar.non_terminals
+
+            # Rule 3
+            for prod in productions:
+                seq = list(prod)
+                while seq:
+                    symbol = seq.pop(0)
+                    if symbol in grammar.terminals | { Grammar.EPSILON }:
+                        continue
+
+                    if not seq:
+                        new_follow[symbol] |= new_follow[nt]
+                        break
+
+                    seq_first = first_sequence(grammar, first, seq)
+                    if Grammar.EPSILON in seq_first:
+                        new_follow[symbol] |= new_follow[nt]
+
+        if new_follow == follow:
+            break
+
+        follow = new_follow
+
+    for val in follow.values():
+        val.discard(Grammar.EPSILON)
+
+    return dict(follow)
+
+
+def simple_table(grammar):
+    return { s: grammar._symbol_simple(s) for s in grammar.non_terminals }
+
+
+def remove_simple(grammar):
+    table = simple_table(grammar)
+
+    grammar._remove_simple_productions()
+
+    for symbol, simple in table.items():
+        for non_terminal in simple:
+            for prod in grammar[non_terminal]:
+                grammar.add_production(symbol, prod)
@@ -0,0 +1,63 @@
+'''
+Times building the LL(1) table again after an edit, which also computes the
+first and follow sets again, on grammars of up to about 10k productions.
+
+The random grammars of `benchmarks.generate` have conflicts in most entries,
+so the table is also timed on grammars close to LL(1), where the productions
+of each non terminal begin with different terminals.
+'''
+import random
+
+from grammar import Grammar, Prod
+from benchmarks import measure
+from benchmarks.generate import random_grammar
+
+
+def predictive_grammar(size, terminals=100, alternatives=3, length=4,
+                       epsilon=0.3, seed=0):
+    '''
+    Generates a grammar with `size` non terminals whose productions begin
+    with different terminals, and some epsilon productions.
+    '''
+    rand = random.Random(seed)
+
+    non_terminals = [ f'A{i}' for i in range(size) ]
+    terminal_list = [ f't{i}' for i in range(terminals) ]
+    symbols = non_terminals + terminal_list
+
+    productions = set()
+    for nt in non_terminals:
+        for terminal in rand.sample(terminal_list, alternatives):
+            prod_len = rand.randint(0, length - 1)
+            prod = tuple(rand.choice(symbols) for _ in range(prod_len))
+            productions.add(Prod(nt, (terminal,) + prod))
+
+        if rand.random() < epsilon:
+            productions.add(Prod(nt, (Grammar.EPSILON,)))
+
+    return Grammar(non_terminals, terminal_list, productions, 'A0')
+
+
+def main():
+    print(f'{"grammar":>10} {"size":>6} {"prods":>7} {"table":>9} '
+          f'{"conflicts":>10}')
+
+    generators = [ ('predictive', predictive_grammar), ('random', random_grammar) ]
+    for name, generate in generators:
+        for size in (300, 1000, 3000):
+            grammar = generate(size, terminals=100, epsilon=0.3, seed=size)
+            non_terminal = next(iter(grammar.non_terminals))
+
+            def edit():
+                # Any change drops the cached table and sets
+                grammar.add_production(non_terminal, ('t0', non_terminal))
+                grammar.remove_production(non_terminal, ('t0', non_terminal))
+
+            table_time = measure(grammar.ll1_table, setup=edit)
+            conflicts = len(grammar.ll1_table().conflicts)
+            print(f'{name:>10} {size:>6} {len(grammar.productions):>7} '
+                  f'{table_time:>9.4f} {conflicts:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+'''
+Compares, using tracemalloc, the memory taken by the productions of large
+grammars when stored as a plain set of `Prod`, as a `ProductionSet` and as a
+`CompactProductionSet`.
+
+Also times both production sets with a single head of many alternatives, and
+removing a terminal that occurs in many productions.
+'''
+import tracemalloc
+
+from grammar import CompactProductionSet, Grammar, Prod, ProductionSet
+from benchmarks import measure
+from benchmarks.generate import random_grammar
+
+
+def allocated(fun):
+    '''
+    Returns the result of `fun` and the bytes allocated while building it
+    that are still in use.
+    '''
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fun()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    print(f'{"size":>6} {"prods":>8} {"set":>10} {"index":>10} '
+          f'{"compact":>10} {"saved":>7}')
+
+    for size in (1000, 10000, 50000):
+        grammar = random_grammar(size, terminals=100, length=8, seed=size)
+
+        # The Prod objects are built inside the measure, like a loader would
+        rows = [ (n, list(p)) for n, p in grammar.productions ]
+        plain, plain_size = allocated(
+            lambda: { Prod(n, tuple(p)) for n, p in rows })
+        _, index_size = allocated(lambda: ProductionSet(plain))
+        index_size += plain_size
+        _, compact_size = allocated(
+            lambda: CompactProductionSet((n, p) for n, p in rows))
+
+        mb = 1024 * 1024
+        print(f'{size:>6} {len(plain):>8} {plain_size / mb:>8.1f}MB '
+              f'{index_size / mb:>8.1f}MB {compact_size / mb:>8.1f}MB '
+              f'{1 - compact_size / plain_size:>6.0%}')
+
+
+def wide_head():
+    print(f'{"alts":>6} {"set":>9} {"compact":>9} {"set in":>9} '
+          f'{"cmp in":>9} {"set MB":>7} {"cmp MB":>7}')
+
+    for alternatives in (1000, 5000, 20000):
+        prods = [ Prod('S', ('a', str(i))) for i in range(alternatives) ]
+        row = [ alternatives ]
+        times = []
+        sizes = []
+        for cls in (ProductionSet, CompactProductionSet):
+            store, size = allocated(lambda: cls(prods))
+            times.append(measure(lambda: cls(prods)))
+            sizes.append(size)
+            row.append(store)
+
+        def contains(store):
+            return lambda: all(prod in store for prod in prods)
+
+        times.append(measure(contains(row[1])))
+        times.append(measure(contains(row[2])))
+        mb = 1024 * 1024
+        print(f'{alternatives:>6} '
+              + ' '.join(f'{t:>9.4f}' for t in times)
+              + f' {sizes[0] / mb:>7.1f} {sizes[1] / mb:>7.1f}')
+
+
+def removal():
+    print(f'{"occurs":>6} {"set":>9} {"compact":>9}')
+
+    for count in (5000, 20000, 80000):
+        prods = [ Prod('S', ('a', 'b', str(i))) for i in range(count) ]
+        times = []
+        for cls in (ProductionSet, CompactProductionSet):
+            grammars = []
+
+            def setup():
+                grammars.append(Grammar(set('S'), set('ab'), cls(prods), 'S'))
+
+            times.append(measure(
+                lambda: grammars.pop().remove_terminal('a'), setup=setup))
+        print(f'{count:>6} {times[0]:>9.4f} {times[1]:>9.4f}')
+
+
+if __name__ == '__main__':
+    main()
+    print()
+    wide_head()
+    print()
+    removal()
@@ -0,0 +1,54 @@
+'''
+Compares the simple productions table and their removal done with a DFS
+per non terminal against the SCC condensed versions, on grammars with long
+chains and cycles of simple productions.
+'''
+from copy import deepcopy
+
+from grammar import Grammar, Prod
+from benchmarks import legacy, measure
+
+
+def chain_grammar(size, cycle=10):
+    '''
+    Generates A0 -> A1 | a0, A1 -> A2 | a1, ..., where every `cycle`-th
+    non terminal also goes back to the start of its block.
+    '''
+    non_terminals = [ f'A{i}' for i in range(size) ]
+    terminals = [ f'a{i}' for i in range(size) ]
+    productions = set()
+    for i, (nt, t) in enumerate(zip(non_terminals, terminals)):
+        productions.add(Prod(nt, (t, nt)))
+        if i + 1 < size:
+            productions.add(Prod(nt, (non_terminals[i + 1],)))
+        if i % cycle == cycle - 1:
+            productions.add(Prod(nt, (non_terminals[i - cycle + 1],)))
+
+    return Grammar(
+        set(non_terminals),
+        set(terminals),
+        productions,
+        non_terminals[0])
+
+
+def main():
+    print(f'{"size":>6} {"op":>12} {"dfs":>9} {"scc":>9} {"speedup":>8}')
+
+    for size in (100, 200, 400, 800):
+        grammar = chain_grammar(size)
+
+        dfs_time = measure(lambda: legacy.simple_table(grammar))
+        scc_time = measure(grammar.simple_table, setup=grammar.cache_clear)
+        print(f'{size:>6} {"simple_table":>12} {dfs_time:>9.4f} '
+              f'{scc_time:>9.4f} {dfs_time / scc_time:>7.1f}x')
+
+        dfs_time = measure(
+            lambda: legacy.remove_simple(deepcopy(grammar)), repeat=1)
+        scc_time = measure(
+            lambda: deepcopy(grammar).remove_simple(), repeat=1)
+        print(f'{size:>6} {"remove":>12} {dfs_time:>9.4f} '
+              f'{scc_time:>9.4f} {dfs_time / scc_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
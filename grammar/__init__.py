@@ -1,2 +1,4 @@
-from grammar.production import Prod
+from grammar.production import Prod, ProductionSet
+from grammar.compact import CompactProductionSet, SymbolTable
 from grammar.grammar import Grammar
+from grammar.cache import DiskCache
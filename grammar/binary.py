@@ -0,0 +1,202 @@
+'''
+Binary format of grammars, loaded with `mmap` so opening a grammar does not
+read or copy its productions.
+
+A file is a header followed by sections, each one aligned to 8 bytes. All
+ints are 32 bit little endian:
+
+    header          magic, version, flags, the number of symbols, the bytes
+                    they take, the number of non terminals, terminals and
+                    productions, the length of all the bodies together and
+                    the id of the start symbol (-1 if there is none)
+    symbols         the UTF-8 symbols, separated by NUL bytes, in id order
+    non terminals   ids of the non terminals
+    terminals       ids of the terminals
+    heads           id of the head of each production
+    offsets         production i has body bodies[offsets[i]:offsets[i + 1]]
+    bodies          ids of the symbols of every body
+    first, next     only with the INDEX flag: the chains of the productions of
+                    each head, as in `CompactProductionSet`
+
+The productions are grouped by head, so the chains can be rebuilt in one pass
+if the index was not saved. The production arrays are used in place as the
+arrays of a `CompactProductionSet`, which copies them on the first change.
+'''
+import mmap
+import struct
+import sys
+from array import array
+
+from grammar.compact import CompactProductionSet, SymbolTable
+
+MAGIC = b'GRMB'
+VERSION = 1
+
+# Flags
+INDEX = 1
+
+_HEADER = struct.Struct('<4sIIIIIIIIi')
+_ALIGN = 8
+
+
+def _padding(size):
+    return -size % _ALIGN
+
+
+def _ints(values):
+    '''
+    Gets an int array, in little endian, of the values.
+    '''
+    values = array('i', values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def save(file, non_terminals, terminals, productions, start, index=True):
+    '''
+    Writes a grammar to a binary file object. If `index` is true the chains
+    of the productions of each head are saved too, so loading does not need
+    to build them.
+
+    Raises ValueError if a symbol is not a string or has a NUL character.
+    '''
+    symbols = set(non_terminals) | set(terminals)
+    rules = []
+    for head in sorted(productions.heads()):
+        bodies = sorted(productions.bodies(head))
+        rules.append((head, bodies))
+        symbols.add(head)
+        for body in bodies:
+            symbols.update(body)
+    if start is not None:
+        symbols.add(start)
+
+    for symbol in symbols:
+        if not isinstance(symbol, str) or '\0' in symbol:
+            raise ValueError(f'symbol {symbol!r} can not be saved')
+
+    symbols = sorted(symbols)
+    ids = { s: i for i, s in enumerate(symbols) }
+
+    prod_heads = array('i')
+    offsets = array('i', [ 0 ])
+    bodies = array('i')
+    first = array('i', [ -1 ]) * len(symbols)
+    next_prods = array('i')
+    for head, head_bodies in rules:
+        head_id = ids[head]
+        for body in head_bodies:
+            next_prods.append(first[head_id])
+            first[head_id] = len(prod_heads)
+            prod_heads.append(head_id)
+            bodies.extend(map(ids.__getitem__, body))
+            offsets.append(len(bodies))
+
+    symbol_data = '\0'.join(symbols).encode('utf-8')
+    sections = [
+        symbol_data,
+        _ints(sorted(ids[s] for s in non_terminals)),
+        _ints(sorted(ids[s] for s in terminals)),
+        _ints(prod_heads),
+        _ints(offsets),
+        _ints(bodies),
+    ]
+    if index:
+        sections.extend([ _ints(first), _ints(next_prods) ])
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        INDEX if index else 0,
+        len(symbols),
+        len(symbol_data),
+        len(non_terminals),
+        len(terminals),
+        len(prod_heads),
+        len(bodies),
+        ids[start] if start is not None else -1)
+
+    file.write(header)
+    file.write(bytes(_padding(len(header))))
+    for section in sections:
+        data = memoryview(section).cast('B')
+        file.write(data)
+        file.write(bytes(_padding(len(data))))
+
+
+def _from_little(values):
+    '''
+    Gets the ints of a little endian memoryview, without copying them if the
+    machine is little endian too.
+    '''
+    if sys.byteorder == 'little':
+        return values.cast('i')
+
+    ints = array('i')
+    ints.frombytes(values)
+    ints.byteswap()
+    return ints
+
+
+def load(file):
+    '''
+    Reads a grammar from a binary file object, opened for reading, and
+    returns its non terminals, terminals, productions and start symbol.
+
+    The productions are a `CompactProductionSet` over a read only mapping of
+    the file, which stays mapped while they use it. Raises ValueError if the
+    file is not in this format or is of another version.
+    '''
+    view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    if len(view) < _HEADER.size:
+        raise ValueError('not a grammar binary file')
+
+    (magic, version, flags, symbol_count, symbol_bytes, non_terminal_count,
+        terminal_count, prod_count, body_length, start) = \
+        _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError('not a grammar binary file')
+    if version != VERSION:
+        raise ValueError(f'unsupported grammar binary version: {version}')
+
+    position = _HEADER.size + _padding(_HEADER.size)
+
+    def section(size):
+        nonlocal position
+        if position + size > len(view):
+            raise ValueError('truncated grammar binary file')
+        values = view[position:position + size]
+        position += size + _padding(size)
+        return values
+
+    symbols = []
+    if symbol_count:
+        symbols = str(section(symbol_bytes), 'utf-8').split('\0')
+    if len(symbols) != symbol_count:
+        raise ValueError('corrupt grammar binary file')
+    table = SymbolTable(symbols)
+
+    non_terminals = _from_little(section(4 * non_terminal_count))
+    terminals = _from_little(section(4 * terminal_count))
+    heads = _from_little(section(4 * prod_count))
+    offsets = _from_little(section(4 * (prod_count + 1)))
+    bodies = _from_little(section(4 * body_length))
+
+    if flags & INDEX:
+        first = _from_little(section(4 * symbol_count))
+        next_prods = _from_little(section(4 * prod_count))
+    else:
+        first = array('i', [ -1 ]) * symbol_count
+        next_prods = array('i', [ -1 ]) * prod_count
+        for index, head in enumerate(heads):
+            next_prods[index] = first[head]
+            first[head] = index
+
+    productions = CompactProductionSet._from_arrays(
+        table, heads, offsets, bodies, first, next_prods)
+    return (
+        [ symbols[i] for i in non_terminals ],
+        [ symbols[i] for i in terminals ],
+        productions,
+        symbols[start] if start != -1 else None)
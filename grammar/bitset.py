@@ -0,0 +1,163 @@
+from grammar.graph import strongly_connected_components
+
+EPSILON = '&'
+FINISH = '$'
+
+
+class BitsetAnalysis(object):
+    '''
+    First and follow sets of a grammar stored as int bitmasks.
+
+    Every symbol that may be in a first or follow set gets a bit: EPSILON is
+    bit 0, FINISH bit 1, then the terminals in sorted order. Unions and
+    subset checks of whole sets are then single int operations, which pays
+    off for grammars with thousands of terminals.
+
+    Attributes:
+        symbols: List with the symbol of each bit.
+        nullable: Set of nullable non terminals.
+        first: Dict from each terminal and non terminal to its first mask.
+        follow: Dict from each symbol to its follow mask.
+    '''
+
+    def __init__(self, grammar):
+        super(BitsetAnalysis, self).__init__()
+        self.symbols = [ EPSILON, FINISH, *sorted(grammar.terminals) ]
+        self._bits = { s: 1 << i for i, s in enumerate(self.symbols) }
+        self.nullable = grammar.nullable() & grammar.non_terminals
+        self.first = self._first(grammar)
+        self.follow = self._follow(grammar)
+
+    def bit(self, symbol):
+        '''
+        Gets the bit of the symbol, giving it a new one if it has none.
+        '''
+        bit = self._bits.get(symbol)
+        if bit is None:
+            bit = self._bits[symbol] = 1 << len(self.symbols)
+            self.symbols.append(symbol)
+        return bit
+
+    def mask(self, symbols):
+        '''
+        Gets the mask of a set of symbols.
+        '''
+        mask = 0
+        for symbol in symbols:
+            mask |= self.bit(symbol)
+        return mask
+
+    def to_set(self, mask):
+        '''
+        Gets the set of symbols of a mask.
+        '''
+        symbols = set()
+        while mask:
+            low = mask & -mask
+            symbols.add(self.symbols[low.bit_length() - 1])
+            mask ^= low
+        return symbols
+
+    def first_sets(self):
+        '''
+        Gets the first sets in the shape of `Grammar.first_sets`.
+        '''
+        return { s: self.to_set(mask) for s, mask in self.first.items() }
+
+    def follow_sets(self):
+        '''
+        Gets the follow sets in the shape of `Grammar.follow_sets`.
+        '''
+        return { s: self.to_set(mask) for s, mask in self.follow.items() }
+
+    def first_of(self, sequence):
+        '''
+        Gets the first mask of a sequence of symbols.
+        '''
+        epsilon = self._bits[EPSILON]
+        mask = 0
+        for symbol in sequence:
+            if symbol == EPSILON:
+                continue
+            if symbol not in self.nullable:
+                return mask | self.first.get(symbol, 0) & ~epsilon
+            mask |= self.first[symbol] & ~epsilon
+        return mask | epsilon
+
+    def _first(self, grammar):
+        epsilon = self._bits[EPSILON]
+        depends = grammar._begins_with(self.nullable)
+
+        seeds = dict.fromkeys(grammar.non_terminals, 0)
+        for symbol in self.nullable:
+            seeds[symbol] = epsilon
+
+        for non_term, prod in grammar.productions:
+            if non_term not in seeds:
+                continue
+
+            for symbol in grammar._left_corners(prod, self.nullable):
+                if symbol not in grammar.non_terminals:
+                    seeds[non_term] |= self.bit(symbol)
+
+        first = { t: self._bits[t] for t in grammar.terminals }
+        for component in strongly_connected_components(depends):
+            mask = 0
+            for symbol in component:
+                mask |= seeds[symbol]
+                for dep in depends[symbol]:
+                    mask |= first.get(dep, 0)
+            mask &= ~epsilon
+
+            for symbol in component:
+                first[symbol] = mask | seeds[symbol] & epsilon
+
+        return first
+
+    def _follow(self, grammar):
+        epsilon = self._bits[EPSILON]
+        follow = dict.fromkeys(grammar.non_terminals, 0)
+        contains = { nt: set() for nt in grammar.non_terminals }
+
+        # Rule 1
+        if grammar.start in follow:
+            follow[grammar.start] = self._bits[FINISH]
+
+        terminals = grammar.terminals
+        for non_term, prod in grammar.productions:
+            # `follow` also gets the symbols found in the bodies
+            if non_term not in contains:
+                continue
+
+            after = epsilon
+            for symbol in reversed(prod):
+                if symbol == EPSILON:
+                    continue
+
+                if symbol not in terminals:
+                    # Rule 2
+                    follow[symbol] = follow.get(symbol, 0) | after & ~epsilon
+
+                    # Rule 3
+                    if after & epsilon:
+                        contains[non_term].add(symbol)
+
+                if symbol not in self.nullable:
+                    after = self.first.get(symbol, 0)
+                else:
+                    after |= self.first[symbol] & ~epsilon
+
+        components = list(strongly_connected_components(contains, follow))
+        for component in reversed(components):
+            component = set(component)
+            mask = 0
+            for symbol in component:
+                mask |= follow[symbol]
+
+            for symbol in component:
+                follow[symbol] = mask
+                for succ in contains.get(symbol, ()):
+                    if succ not in component:
+                        follow[succ] |= mask
+
+        return follow
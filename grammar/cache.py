@@ -0,0 +1,278 @@
+import inspect
+import os
+import pickle
+import sqlite3
+import time
+from collections import namedtuple
+from functools import wraps
+
+'''
+Statistics of the analysis cache of a grammar.
+
+Attributes:
+    hits: Calls answered from the cache.
+    misses: Calls that had to compute the result.
+    size: Number of results in the cache.
+'''
+CacheInfo = namedtuple('CacheInfo', [ 'hits', 'misses', 'size' ])
+
+
+def cached(copy=None, persist=False):
+    '''
+    Caches the result of a grammar method until the grammar changes.
+
+    The whole cache is dropped as soon as the `version` of the grammar is not
+    the one the results were computed from. If `copy` is given, it is
+    applied to the cached result before returning it, so the caller may
+    change what it gets.
+
+    If `persist` is true and the grammar has a `disk_cache`, results missing
+    from memory are looked up there, by the content digest of the grammar,
+    and stored there once computed, so they outlive the process.
+
+    Results are keyed by the arguments bound to the parameters of the method,
+    with their defaults, so the same call written in different ways shares
+    its result.
+    '''
+    def decorator(fun):
+        signature = inspect.signature(fun)
+        positional = len(signature.parameters) - 1
+
+        @wraps(fun)
+        def wrapped(self, *args, **kwargs):
+            if kwargs or len(args) != positional:
+                bound = signature.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                args = bound.args[1:]
+
+            version = self.version
+            if self._cache_version != version:
+                self._cache.clear()
+                self._cache_version = version
+
+            key = (fun.__name__,) + args
+            try:
+                result = self._cache[key]
+                self._cache_hits += 1
+            except KeyError:
+                self._cache_misses += 1
+                # Incremental grammars are cheap to analyze again after each
+                # change, writing every result to disk would not pay off
+                if persist and self.disk_cache is not None \
+                        and not self.incremental:
+                    result = _persisted(self, key, fun, args)
+                else:
+                    result = fun(self, *args)
+                self._cache[key] = result
+
+            if copy is not None:
+                return copy(result)
+            return result
+        return wrapped
+    return decorator
+
+
+def _persisted(grammar, key, fun, args):
+    '''
+    Gets a result from the disk cache of the grammar, computing and storing
+    it there if it is missing.
+    '''
+    disk_key = f'{key!r}:{grammar.content_digest()}'
+    try:
+        return grammar.disk_cache[disk_key]
+    except KeyError:
+        result = grammar.disk_cache[disk_key] = fun(grammar, *args)
+        return result
+
+
+def copy_dict(dct):
+    '''
+    Copies a dict of sets.
+    '''
+    return { k: set(v) for k, v in dct.items() }
+
+
+class DiskCache(object):
+    '''
+    Analysis results stored in a SQLite database, so they can be shared by
+    later runs and by several processes at once.
+
+    It maps string keys to pickled values. Each write is a transaction, and
+    once the values take more than `max_size` bytes the least recently used
+    ones are dropped. Errors of the database, like a lock held for longer
+    than `timeout` seconds, are treated as misses, so a broken cache only
+    makes analyses slower.
+
+    Attributes:
+        path: Path of the database file.
+        max_size: Bytes the pickled values may take before evicting.
+        hits: Lookups found in the database.
+        misses: Lookups not found in the database.
+    '''
+
+    # Changed whenever the shape or meaning of a cached result changes, so
+    # results of older versions are never read
+    FORMAT = 2
+
+    def __init__(self, path=None, max_size=256 * 1024 * 1024, timeout=10):
+        super(DiskCache, self).__init__()
+        if path is None:
+            path = os.path.join(DiskCache.default_directory(), 'analysis.db')
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pid = None
+
+    @staticmethod
+    def default_directory():
+        '''
+        Gets the directory of the default database, `$GRAMMAR_CACHE_DIR` or
+        else `grammar` inside the user cache directory.
+        '''
+        directory = os.environ.get('GRAMMAR_CACHE_DIR')
+        if directory is None:
+            base = os.environ.get('XDG_CACHE_HOME') \
+                or os.path.join(os.path.expanduser('~'), '.cache')
+            directory = os.path.join(base, 'grammar')
+        return directory
+
+    def _connect(self):
+        '''
+        Gets the connection of this process to the database, creating the
+        database if needed. Connections are not shared with forked children.
+        '''
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                used REAL NOT NULL
+            )''')
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+
+        self._connection = connection
+        self._pid = os.getpid()
+        return connection
+
+    def _key(self, key):
+        return f'{DiskCache.FORMAT}:{key}'
+
+    def __getitem__(self, key):
+        key = self._key(key)
+        try:
+            connection = self._connect()
+            row = connection.execute(
+                'SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error:
+            row = None
+
+        if row is None:
+            self.misses += 1
+            raise KeyError(key)
+
+        # Only marks the value as recently used, a value that was read is
+        # still a hit if another process holds the lock
+        try:
+            connection.execute(
+                'UPDATE results SET used = ? WHERE key = ?',
+                (time.time(), key))
+        except sqlite3.Error:
+            pass
+
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def __setitem__(self, key, value):
+        key = self._key(key)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_size:
+            return
+
+        try:
+            connection = self._connect()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                    (key, value, len(value), time.time()))
+                self._evict(connection)
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, connection):
+        '''
+        Drops the least recently used values until the rest fit in
+        `max_size`.
+        '''
+        total, = connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results').fetchone()
+        if total <= self.max_size:
+            return
+
+        rows = connection.execute(
+            'SELECT key, size FROM results ORDER BY used').fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            evicted.append((key,))
+            total -= size
+        connection.executemany('DELETE FROM results WHERE key = ?', evicted)
+
+    def __contains__(self, key):
+        try:
+            row = self._connect().execute(
+                'SELECT 1 FROM results WHERE key = ?',
+                (self._key(key),)).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None
+
+    def __len__(self):
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def size(self):
+        '''
+        Gets the bytes taken by the pickled values.
+        '''
+        return self._connect().execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def clear(self):
+        '''
+        Drops every stored value.
+        '''
+        self._connect().execute('DELETE FROM results')
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def __getstate__(self):
+        # Connections can not be pickled, each process opens its own
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_pid'] = None
+        return state
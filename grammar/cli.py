@@ -0,0 +1,260 @@
+'''
+Command line interface, run as `python -m grammar`, that analyzes batches of
+grammars without the Qt interface.
+
+Grammars come from a directory, with one grammar per file in the text or
+binary format, from a single grammar file, or from a JSON lines file (or
+stdin, given as -) with one object per line, like:
+
+    {"name": "expr", "grammar": "E -> E + T | T\\nT -> a"}
+
+The chosen operations run over a pool of processes, and a JSON object with
+the results of each grammar is written as soon as it is done:
+
+    {"index": 0, "name": "expr", "results": {"finite": false}}
+
+Grammars that fail are written with an "error" instead of "results".
+'''
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from grammar import binary
+from grammar.grammar import Grammar
+from grammar.loader import load_file, loads
+
+
+def _first(grammar):
+    return grammar.first_sets()
+
+
+def _follow(grammar):
+    return grammar.follow_sets()
+
+
+def _proper(grammar):
+    grammar = grammar.copy()
+    grammar.remove_epsilon()
+    grammar.remove_simple()
+    grammar.remove_useless()
+    return str(grammar)
+
+
+def _factor(grammar):
+    grammar = grammar.copy()
+    result = grammar.left_factor()
+    return {
+        'factored': result.factored,
+        'rounds': result.rounds,
+        'grammar': str(grammar),
+    }
+
+
+def _remove_left_recursion(grammar):
+    grammar = grammar.copy()
+    grammar.remove_left_recursion()
+    return str(grammar)
+
+
+def _finite(grammar):
+    return grammar.is_finite()
+
+
+def _empty(grammar):
+    return grammar.is_empty()
+
+
+'''
+Operations that can be run, by name. Each one gets a grammar, which it must
+not change, and returns its result.
+'''
+OPERATIONS = {
+    'first': _first,
+    'follow': _follow,
+    'proper': _proper,
+    'factor': _factor,
+    'remove-left-recursion': _remove_left_recursion,
+    'finite': _finite,
+    'empty': _empty,
+}
+
+
+def to_json(value):
+    '''
+    Converts a result to values JSON can encode, sets becoming sorted lists.
+    '''
+    if isinstance(value, dict):
+        return { str(k): to_json(v) for k, v in value.items() }
+    if isinstance(value, (set, frozenset)):
+        return sorted(to_json(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [ to_json(v) for v in value ]
+    return value
+
+
+def read_grammar(path):
+    '''
+    Reads a grammar file in the binary format, if it starts with its magic
+    bytes, or else in the text format.
+    '''
+    with open(path, 'rb') as file:
+        if file.read(len(binary.MAGIC)) == binary.MAGIC:
+            return Grammar.load_binary(path)
+    return load_file(path)
+
+
+def tasks_from(source, stdin):
+    '''
+    Yields a (name, kind, value) task for each grammar of the source, where
+    the value is the path of a grammar file for the 'file' kind, or a line of
+    JSON for the 'json' kind.
+    '''
+    if source == '-' or source.endswith('.jsonl'):
+        lines = stdin if source == '-' else open(source, encoding='utf-8')
+        try:
+            for number, line in enumerate(lines, 1):
+                if line.strip():
+                    yield str(number), 'json', line
+        finally:
+            if lines is not stdin:
+                lines.close()
+    elif os.path.isdir(source):
+        for entry in sorted(os.listdir(source)):
+            path = os.path.join(source, entry)
+            if os.path.isfile(path):
+                yield entry, 'file', path
+    else:
+        yield os.path.basename(source), 'file', source
+
+
+def run_task(task, operations):
+    '''
+    Runs the operations over the grammar of a task and returns its record.
+    '''
+    index, name, kind, value = task
+    record = { 'index': index, 'name': name }
+    try:
+        if kind == 'file':
+            grammar = read_grammar(value)
+        else:
+            value = json.loads(value)
+            record['name'] = value.get('name', name)
+            grammar = loads(value['grammar'])
+
+        record['results'] = {
+            operation: to_json(OPERATIONS[operation](grammar))
+            for operation in operations
+        }
+    except Exception as e:
+        # A grammar that fails must not stop the rest of the batch
+        record['error'] = f'{type(e).__name__}: {e}'
+    return record
+
+
+def run_chunk(tasks, operations):
+    return [ run_task(task, operations) for task in tasks ]
+
+
+def _chunks(tasks, size):
+    tasks = iter(tasks)
+    while True:
+        chunk = list(islice(tasks, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(tasks, operations, workers=None, chunk_size=1):
+    '''
+    Yields the record of each task as soon as it is done, in no particular
+    order.
+
+    Tasks are sent to `workers` processes (all the CPUs if None, or this
+    process if 0) in chunks of `chunk_size`. Only a few chunks per worker are
+    pending at once, so the tasks may come from a stream of any length.
+    '''
+    tasks = ( (i, *task) for i, task in enumerate(tasks) )
+    chunks = _chunks(tasks, chunk_size)
+
+    if workers == 0:
+        for chunk in chunks:
+            yield from run_chunk(chunk, operations)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with ProcessPoolExecutor(workers) as executor:
+        limit = 2 * workers
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(run_chunk, chunk, operations))
+            if len(pending) < limit:
+                continue
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m grammar',
+        description='Analyzes grammars, writing one JSON object per grammar.')
+    parser.add_argument(
+        'source',
+        help='directory of grammar files, grammar file, JSON lines file, '
+             'or - to read JSON lines from stdin')
+    parser.add_argument(
+        '-o', '--operation',
+        action='append',
+        choices=sorted(OPERATIONS),
+        dest='operations',
+        help='operation to run, may be repeated (default: all)')
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=None,
+        help='worker processes, 0 to run in this process '
+             '(default: number of CPUs)')
+    parser.add_argument(
+        '-c', '--chunk-size',
+        type=int,
+        default=1,
+        help='grammars sent to a worker at once (default: 1)')
+
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 0:
+        parser.error('--workers must not be negative')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be positive')
+    if args.operations is None:
+        args.operations = list(OPERATIONS)
+    return args
+
+
+def main(argv=None, stdin=None, stdout=None):
+    '''
+    Runs the command line interface and returns its exit status, 1 if any
+    grammar failed.
+    '''
+    args = parse_args(argv)
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+
+    status = 0
+    tasks = tasks_from(args.source, stdin)
+    for record in run(tasks, args.operations, args.workers, args.chunk_size):
+        if 'error' in record:
+            status = 1
+        stdout.write(json.dumps(record) + '\n')
+        stdout.flush()
+    return status
@@ -0,0 +1,377 @@
+from array import array
+
+from grammar.production import Prod, ProductionSet
+
+
+def _copy_array(values):
+    '''
+    Copies an int array, or a memoryview of ints, into a new array.
+    '''
+    copy = array('i')
+    copy.frombytes(memoryview(values).cast('B'))
+    return copy
+
+
+class SymbolTable(object):
+    '''
+    Maps symbols to small integers and back.
+
+    Ids are given in insertion order and are never reused, so a table can be
+    shared by several production sets.
+    '''
+
+    def __init__(self, symbols=()):
+        super(SymbolTable, self).__init__()
+        self._symbols = list(dict.fromkeys(symbols))
+        self._ids = dict(zip(self._symbols, range(len(self._symbols))))
+
+    def intern(self, symbol):
+        '''
+        Gets the id of the symbol, giving it a new one if it has none.
+        '''
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return symbol_id
+
+    def get(self, symbol):
+        '''
+        Gets the id of the symbol, or None if it has none.
+        '''
+        return self._ids.get(symbol)
+
+    def symbol(self, symbol_id):
+        return self._symbols[symbol_id]
+
+    def __contains__(self, symbol):
+        return symbol in self._ids
+
+    def __len__(self):
+        return len(self._symbols)
+
+
+class CompactProductionSet(ProductionSet):
+    '''
+    Production set that stores symbols as integers in flat arrays.
+
+    Production i has head `heads[i]` and its body is
+    `bodies[offsets[i]:offsets[i + 1]]`. Removed productions are only marked
+    in `alive` and the arrays are compacted once most of them are dead.
+    `Prod` objects are only built when the productions are read, so it holds
+    large grammars in a fraction of the memory of a set of `Prod`.
+
+    The productions of each head are chained: `first[head]` is the last one
+    added and `next[i]` the one added before production i. The chains are
+    only used to iterate, lookups go through a hash table of the production
+    indexes kept in an int array, with linear probing. Removed productions
+    stay in the chains, the hash table and the index by symbol, used by
+    `occurrences`, which skip them, until the arrays are compacted. The hash
+    table and the index by symbol are only built the first time they are
+    needed.
+
+    `copy` shares the arrays until one of the sets changes, which then copies
+    them, a single memory copy each. So does building a set from another one
+    with the same symbol table. The arrays may also be memoryviews of a file,
+    see `grammar.binary`, which are copied the same way.
+
+    Attributes:
+        symbols: `SymbolTable` used to intern the symbols.
+        version: Counter incremented every time the set changes.
+    '''
+
+    def __init__(self, productions=(), symbols=None):
+        if symbols is None:
+            symbols = getattr(productions, 'symbols', None)
+        if symbols is None:
+            symbols = SymbolTable()
+        self.symbols = symbols
+
+        if isinstance(productions, CompactProductionSet) \
+                and productions.symbols is symbols:
+            self.__dict__.update(productions.copy().__dict__)
+            return
+
+        self._prod_heads = array('i')
+        self._offsets = array('i', [ 0 ])
+        self._bodies = array('i')
+        self._alive = bytearray()
+        self._first = array('i')
+        self._next = array('i')
+        self._by_symbol = None
+        self._table = None
+        self._used = 0
+        self._dead = 0
+        super(CompactProductionSet, self).__init__(productions)
+
+    def add(self, prod):
+        non_terminal, production = prod
+        head = self.symbols.intern(non_terminal)
+        body = array('i', map(self.symbols.intern, production))
+        key = self._hash(head, body)
+        if self._find(head, body, key) is not None:
+            return
+
+        if self._shared:
+            self._unshare()
+        if len(self._first) < len(self.symbols):
+            self._first.extend([ -1 ] * (len(self.symbols) - len(self._first)))
+
+        index = len(self._prod_heads)
+        self._prod_heads.append(head)
+        self._bodies.extend(body)
+        self._offsets.append(len(self._bodies))
+        self._alive.append(1)
+        self._next.append(self._first[head])
+        self._first[head] = index
+        self._insert(index, key)
+
+        if self._by_symbol is not None:
+            for symbol in { head, *body }:
+                self._by_symbol.setdefault(symbol, array('i')).append(index)
+
+        self._size += 1
+        self.version += 1
+        self._update_digest(prod, 1)
+
+    def discard(self, prod):
+        index = self._lookup(prod)
+        if index is None:
+            return
+
+        if self._shared:
+            self._unshare()
+
+        # The production is left in the chains and indexes, marked as dead
+        self._alive[index] = 0
+        self._size -= 1
+        self._dead += 1
+        self.version += 1
+        self._update_digest(prod, -1)
+
+        if self._dead > self._size:
+            self._compact()
+
+    def bodies(self, non_terminal):
+        head = self.symbols.get(non_terminal)
+        return { self._prod(i).p for i in self._chain(head) }
+
+    def occurrences(self, symbol):
+        if self._by_symbol is None:
+            self._build_symbol_index()
+
+        symbol_id = self.symbols.get(symbol)
+        return {
+            self._prod(i)
+            for i in self._by_symbol.get(symbol_id, ())
+            if self._alive[i]
+        }
+
+    def heads(self):
+        return {
+            self.symbols.symbol(head)
+            for head in range(len(self._first))
+            if next(self._chain(head), None) is not None
+        }
+
+    def copy(self):
+        copy = type(self).__new__(type(self))
+        copy.__dict__.update(self.__dict__)
+        copy._shared = self._shared = True
+        return copy
+
+    @classmethod
+    def _from_arrays(cls, symbols, heads, offsets, bodies, first, next_prods):
+        '''
+        Builds a set over existing arrays, which are treated as shared.
+        '''
+        prods = cls.__new__(cls)
+        ProductionSet.__init__(prods)
+        prods.symbols = symbols
+        prods._prod_heads = heads
+        prods._offsets = offsets
+        prods._bodies = bodies
+        prods._alive = bytearray(b'\x01') * len(heads)
+        prods._first = first
+        prods._next = next_prods
+        prods._by_symbol = None
+        prods._table = None
+        prods._used = 0
+        prods._dead = 0
+        prods._size = len(heads)
+        prods._shared = True
+        return prods
+
+    def _unshare(self):
+        '''
+        Copies the arrays shared with other sets before changing them.
+        '''
+        self._prod_heads = _copy_array(self._prod_heads)
+        self._offsets = _copy_array(self._offsets)
+        self._bodies = _copy_array(self._bodies)
+        self._alive = bytearray(self._alive)
+        self._first = _copy_array(self._first)
+        self._next = _copy_array(self._next)
+        if self._by_symbol is not None:
+            self._by_symbol = {
+                symbol: array('i', indexes)
+                for symbol, indexes in self._by_symbol.items()
+            }
+        if self._table is not None:
+            self._table = array('i', self._table)
+        self._shared = False
+
+    def _body(self, index):
+        return self._bodies[self._offsets[index]:self._offsets[index + 1]]
+
+    def _prod(self, index):
+        symbols = self.symbols._symbols
+        return Prod(
+            symbols[self._prod_heads[index]],
+            tuple(map(symbols.__getitem__, self._body(index))))
+
+    def _chain(self, head):
+        '''
+        Yields the index of each production of the head.
+        '''
+        if head is None or head >= len(self._first):
+            return
+
+        index = self._first[head]
+        while index != -1:
+            if self._alive[index]:
+                yield index
+            index = self._next[index]
+
+    @staticmethod
+    def _hash(head, body):
+        return hash((head, memoryview(body).tobytes()))
+
+    def _find(self, head, body, key):
+        '''
+        Gets the index of the production with hash `key`, or None if it is
+        not in the set.
+        '''
+        if self._table is None:
+            self._build_table()
+
+        table = self._table
+        mask = len(table) - 1
+        slot = key & mask
+        while True:
+            index = table[slot]
+            if index == -1:
+                return None
+            if self._alive[index] and self._prod_heads[index] == head \
+                    and self._body(index) == body:
+                return index
+            slot = (slot + 1) & mask
+
+    def _insert(self, index, key):
+        '''
+        Adds a production, known not to be in the set, to the hash table.
+        Slots of dead productions are reused.
+        '''
+        if 3 * (self._used + 1) > 2 * len(self._table):
+            self._build_table()
+            return
+
+        table = self._table
+        mask = len(table) - 1
+        slot = key & mask
+        while table[slot] != -1 and self._alive[table[slot]]:
+            slot = (slot + 1) & mask
+        if table[slot] == -1:
+            self._used += 1
+        table[slot] = index
+
+    def _build_table(self):
+        '''
+        Builds the hash table of the live productions, at most half full.
+        '''
+        size = 8
+        while size < 2 * (self._size + 1):
+            size *= 2
+
+        table = array('i', [ -1 ]) * size
+        mask = size - 1
+        used = 0
+        for index, alive in enumerate(self._alive):
+            if not alive:
+                continue
+            key = self._hash(self._prod_heads[index], self._body(index))
+            slot = key & mask
+            while table[slot] != -1:
+                slot = (slot + 1) & mask
+            table[slot] = index
+            used += 1
+
+        self._table = table
+        self._used = used
+
+    def _lookup(self, prod):
+        try:
+            non_terminal, production = prod
+            head = self.symbols.get(non_terminal)
+            body = array('i', ( self.symbols.get(s) for s in production ))
+        except (TypeError, ValueError):
+            return None
+
+        if head is None:
+            return None
+        return self._find(head, body, self._hash(head, body))
+
+    def _build_symbol_index(self):
+        self._by_symbol = {}
+        for index, alive in enumerate(self._alive):
+            if not alive:
+                continue
+            head = self._prod_heads[index]
+            for symbol in { head, *self._body(index) }:
+                self._by_symbol.setdefault(symbol, array('i')).append(index)
+
+    def _compact(self):
+        '''
+        Drops the removed productions from the arrays.
+        '''
+        heads = array('i')
+        offsets = array('i', [ 0 ])
+        bodies = array('i')
+        first = array('i', [ -1 ]) * len(self._first)
+        next_prods = array('i')
+        for index, alive in enumerate(self._alive):
+            if alive:
+                head = self._prod_heads[index]
+                next_prods.append(first[head])
+                first[head] = len(heads)
+                heads.append(head)
+                bodies.extend(self._body(index))
+                offsets.append(len(bodies))
+
+        self._prod_heads = heads
+        self._offsets = offsets
+        self._bodies = bodies
+        self._first = first
+        self._next = next_prods
+        self._alive = bytearray(b'\x01') * len(heads)
+        self._dead = 0
+        self._by_symbol = None
+        self._table = None
+
+    def __getstate__(self):
+        # Memoryviews of a file can not be pickled, and the hash table
+        # depends on the hashes of this process
+        state = self.__dict__.copy()
+        state['_table'] = None
+        for name in ('_prod_heads', '_offsets', '_bodies', '_first', '_next'):
+            if isinstance(state[name], memoryview):
+                state[name] = _copy_array(state[name])
+        return state
+
+    def __contains__(self, prod):
+        return self._lookup(prod) is not None
+
+    def __iter__(self):
+        for index, alive in enumerate(self._alive):
+            if alive:
+                yield self._prod(index)
@@ -0,0 +1,25 @@
+'''
+Order independent digests of sets, that can be kept up to date as items are
+added and removed.
+
+The digest of a set is the sum, modulo 2 ** 256, of the SHA-256 of the repr
+of each of its items. It does not depend on the order the items were added,
+and adding or removing an item only adds or subtracts the digest of that item.
+'''
+from hashlib import sha256
+
+MODULUS = 1 << 256
+
+
+def digest(item):
+    '''
+    Gets the digest of a single item, as an int.
+    '''
+    return int.from_bytes(sha256(repr(item).encode('utf-8')).digest(), 'big')
+
+
+def digest_all(items):
+    '''
+    Gets the digest of a set of items.
+    '''
+    return sum(map(digest, items)) % MODULUS
@@ -1,39 +1,307 @@
 import re
+from hashlib import sha256
 from itertools import combinations
-from collections import defaultdict
-from copy import deepcopy
+from collections import defaultdict, deque, namedtuple
 from pprint import pprint
 
-from grammar.production import Prod
+from grammar import binary
+from grammar.bitset import BitsetAnalysis
+from grammar.cache import CacheInfo, cached, copy_dict
+from grammar.graph import find_cycle, strongly_connected_components
+from grammar.incremental import IncrementalAnalysis
+from grammar.ll1 import LL1Table
+from grammar.names import NameAllocator
+from grammar.production import Prod, ProductionSet
+from grammar.symbols import SymbolSet
+
+'''
+Result of `Grammar.left_factor`.
+
+Attributes:
+    rounds: Number of rounds that changed the grammar.
+    new_symbols: List of the non terminals created, in creation order.
+    factored: If the grammar ended up factored.
+'''
+FactorResult = namedtuple('FactorResult', [ 'rounds', 'new_symbols', 'factored' ])
 
 class Grammar(object):
 
     EPSILON = '&'
     FINISH = '$'
 
+    _EPSILON_SET = frozenset({ EPSILON })
+
+    # `DiskCache` where the costly analyses are also kept, by the content
+    # digest of the grammar, so they survive the process. Off unless set, for every
+    # grammar or for a single one.
+    disk_cache = None
+
     def __init__(self, non_terminals, terminals, productions, start):
         super(Grammar, self).__init__()
+        self._revision = 0
+        self._cache = {}
+        self._cache_version = None
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._incremental = None
+        self._names = NameAllocator()
+
+        # Keep nullable, first and follow sets up to date while productions
+        # are added and removed, see `IncrementalAnalysis`
+        self.incremental = False
+
         self.non_terminals = non_terminals
         self.terminals = terminals
         self.productions = productions
         self.start = start
 
+    @property
+    def non_terminals(self):
+        return self._non_terminals
+
+    @non_terminals.setter
+    def non_terminals(self, non_terminals):
+        self._replace('_non_terminals', non_terminals, SymbolSet)
+
+    @property
+    def terminals(self):
+        return self._terminals
+
+    @terminals.setter
+    def terminals(self, terminals):
+        self._replace('_terminals', terminals, SymbolSet)
+
+    @property
+    def productions(self):
+        return self._productions
+
+    @productions.setter
+    def productions(self, productions):
+        self._replace('_productions', productions, ProductionSet)
+
+    @property
+    def start(self):
+        return self._start
+
+    @start.setter
+    def start(self, start):
+        if getattr(self, '_start', None) != start:
+            self._revision += 1
+        self._start = start
+
+    @property
+    def version(self):
+        '''
+        Counter that changes every time the grammar changes, including
+        changes made directly to the symbol and production sets.
+        '''
+        return (self._revision
+            + self._non_terminals.version
+            + self._terminals.version
+            + self._productions.version)
+
+    def fingerprint(self):
+        '''
+        Gets a SHA-256 hex digest of the content of the grammar.
+
+        Equal grammars have the same fingerprint, whatever the order their
+        symbols and productions were added in. The digests of the sets are
+        kept up to date as they change, so only the first call goes through
+        the whole grammar.
+        '''
+        content = (f'{self._non_terminals.digest():064x}'
+            f'{self._terminals.digest():064x}'
+            f'{self._productions.digest():064x}'
+            f'{self.start!r}')
+        return sha256(content.encode('utf-8')).hexdigest()
+
+    @cached()
+    def content_digest(self):
+        '''
+        Gets a SHA-256 hex digest of the canonical form of the grammar, its
+        symbols and productions in sorted order.
+
+        Unlike `fingerprint`, whose digests of the sets are sums that can be
+        made to collide, it is collision resistant, so it is what keys the
+        results in the `disk_cache`. It goes through the whole grammar, once
+        per version.
+        '''
+        content = sha256()
+
+        def section(items):
+            items = sorted(map(repr, items))
+            content.update(f'{len(items)}\n'.encode('utf-8'))
+            for item in items:
+                content.update(f'{len(item)}:{item}'.encode('utf-8'))
+
+        section(self._non_terminals)
+        section(self._terminals)
+        section((n, tuple(p)) for n, p in self._productions)
+        section([ self.start ])
+        return content.hexdigest()
+
+    def _replace(self, name, value, cls):
+        # In place operators, like `grammar.terminals -= ...`, assign the same
+        # set back
+        old = getattr(self, name, None)
+        if value is old:
+            return
+
+        # Keeps the version increasing when a set is replaced by a new one,
+        # whose own counter starts from zero again
+        if old is not None:
+            self._revision += old.version + 1
+
+        # Keeps the kind of set in use, e.g. a `CompactProductionSet`
+        if isinstance(value, cls):
+            cls = type(value)
+        elif old is not None:
+            cls = type(old)
+        setattr(self, name, cls(value))
+
+    def cache_info(self):
+        '''
+        Gets the hits, misses and size of the cache of analysis results.
+        '''
+        return CacheInfo(self._cache_hits, self._cache_misses, len(self._cache))
+
+    def cache_clear(self):
+        '''
+        Drops every cached analysis result.
+        '''
+        self._cache.clear()
+
+    def __getstate__(self):
+        # Copies and pickles start with an empty cache
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        state['_cache_version'] = None
+        state['_cache_hits'] = 0
+        state['_cache_misses'] = 0
+        state['_incremental'] = None
+        return state
+
+    def copy(self):
+        '''
+        Returns a snapshot of the grammar.
+
+        The productions are shared with the snapshot until either grammar
+        changes them, see `ProductionSet.copy`, and so are the analysis
+        results already cached. Only the symbol sets are copied.
+        '''
+        grammar = Grammar.__new__(Grammar)
+        grammar.__dict__.update(self.__getstate__())
+        grammar._non_terminals = self._non_terminals.copy()
+        grammar._terminals = self._terminals.copy()
+        grammar._productions = self._productions.copy()
+        grammar._names = self._names.copy()
+
+        # The incremental analysis changes its sets in place
+        if self._cache_version == self.version and self._incremental is None:
+            grammar._cache = dict(self._cache)
+            grammar._cache_version = self._cache_version
+        return grammar
+
+    def save_binary(self, path, index=True):
+        '''
+        Saves the grammar to a file in the binary format of `grammar.binary`.
+        If `index` is true the productions of each non terminal are indexed
+        in the file too, so loading it does not need to index them.
+        '''
+        with open(path, 'wb') as file:
+            binary.save(
+                file,
+                self.non_terminals,
+                self.terminals,
+                self.productions,
+                self.start,
+                index)
+
+    @classmethod
+    def load_binary(cls, path):
+        '''
+        Loads a grammar saved by `save_binary`.
+
+        The file is memory mapped and its productions are used in place, in a
+        `CompactProductionSet`, so loading takes about the time of reading
+        the symbols. They are only copied when the grammar is changed.
+        '''
+        with open(path, 'rb') as file:
+            return cls(*binary.load(file))
+
+    def _analysis(self):
+        '''
+        Gets the incremental analysis of the grammar, computing it again if it
+        is out of date, or None if `incremental` is off.
+        '''
+        if not self.incremental:
+            self._incremental = None
+            return None
+
+        if self._incremental is None or not self._incremental.sync():
+            self._incremental = IncrementalAnalysis(self)
+        return self._incremental
+
+    def _tracked_analysis(self):
+        '''
+        Gets the incremental analysis only if it is up to date, so a change
+        about to be made can be applied to it.
+        '''
+        analysis = self._incremental
+        if analysis is None or not self.incremental or not analysis.sync():
+            self._incremental = None
+            return None
+        return analysis
+
     def add_production(self, non_terminal, production):
-        self.productions.add(Prod(non_terminal, production))
+        prod = Prod(non_terminal, production)
+        if prod in self.productions:
+            return
+
+        analysis = self._tracked_analysis()
+        self.productions.add(prod)
+        if analysis is not None:
+            analysis.add([ prod ])
+
+    def remove_production(self, non_terminal, production):
+        '''
+        Remove a single production from grammar.
+        '''
+        prod = Prod(non_terminal, production)
+        if prod not in self.productions:
+            return
+
+        analysis = self._tracked_analysis()
+        self.productions.discard(prod)
+        if analysis is not None:
+            analysis.remove([ prod ])
 
     def remove_non_terminal(self, symbol):
         '''
         Remove non terminal symbol from grammar.
         '''
+        analysis = self._tracked_analysis()
         self.non_terminals.discard(symbol)
-        self._remove_productions_with_symbol(symbol)
+        removed = self._remove_productions_with_symbol(symbol)
+        if analysis is not None:
+            analysis.remove_symbol(symbol, removed)
 
     def remove_terminal(self, symbol):
         '''
         Remove terminal symbol from grammar.
         '''
+        analysis = self._tracked_analysis()
         self.terminals.discard(symbol)
-        self._remove_productions_with_symbol(symbol)
+        removed = self._remove_productions_with_symbol(symbol)
+        if analysis is not None:
+            analysis.remove_symbol(symbol, removed)
+
+    def occurrences(self, symbol):
+        '''
+        Returns the set of productions where the symbol appears, either as
+        the non terminal or inside the production.
+        '''
+        return self.productions.occurrences(symbol)
 
     def remove_unproductive(self):
         '''
@@ -63,18 +331,26 @@ class Grammar(object):
         self.remove_unproductive()
         self.remove_unreachable()
 
-    def remove_epsilon(self):
+    def remove_epsilon(self, binarize=False):
         '''
         Transforms the grammar into a epslon free grammar.
+
+        Each production is copied without every combination of its nullable
+        symbols, so a body with k nullable symbols gives 2^k productions. If
+        `binarize` is true, the productions with nullable symbols that are
+        longer than two symbols are first split with new non terminals, like
+        A -> X A0, A0 -> Y A1, A1 -> Z W, so the grammar only grows linearly.
         '''
         # Ne
-        closure = self._epsilon_closure()
+        nullable = self.nullable()
         self._remove_productions_with_symbol(Grammar.EPSILON)
+        if binarize:
+            nullable = self._binarize(nullable)
 
         new_prods = set()
         for prod in self.productions:
             # Generate possible combinations of the epslon set symbols
-            for comb in Grammar.epsilon_combinations(prod, closure):
+            for comb in Grammar.epsilon_combinations(prod, nullable):
                 new_prod = list(prod.p)
                 for c, _ in comb:
                     new_prod[c] = ''
@@ -86,7 +362,7 @@ class Grammar(object):
             if production:
                 self.add_production(non_terminal, production)
 
-        if (self.start,) not in closure:
+        if self.start not in nullable:
             return
 
         # S' -> S | epsilon
@@ -96,21 +372,104 @@ class Grammar(object):
         self.add_production(new_start, (Grammar.EPSILON,))
         self.start = new_start
 
+    def _binarize(self, nullable):
+        '''
+        Splits the productions longer than two symbols that have nullable
+        symbols into productions of two symbols. Productions with the same
+        suffix share its new non terminal.
+
+        Returns the set of nullable symbols, including the new ones.
+        '''
+        nullable = set(nullable)
+        long_prods = [
+            prod for prod in self.productions
+            if len(prod.p) > 2 and not nullable.isdisjoint(prod.p)
+        ]
+
+        tails = {}
+        for non_terminal, production in long_prods:
+            self.productions.discard(Prod(non_terminal, production))
+
+            # Builds the chain from the end, each new non terminal derives
+            # the suffix after the symbol before it
+            tail = production[-2:]
+            for i in range(len(production) - 3, -1, -1):
+                suffix = production[i + 1:]
+                symbol = tails.get(suffix)
+                if symbol is None:
+                    symbol = tails[suffix] = self._get_next_nt(non_terminal)
+                    self.non_terminals.add(symbol)
+                    self.add_production(symbol, tail)
+                    if all(s in nullable for s in tail):
+                        nullable.add(symbol)
+                tail = (production[i], symbol)
+
+            self.add_production(non_terminal, tail)
+
+        return nullable
+
     def remove_simple(self):
         '''
         Remove simple productions from the grammar.
-        '''
-        simple_table = self.simple_table()
 
+        Each non terminal gets the productions of every non terminal it
+        derives through simple productions. The productions are gathered
+        once per strongly connected component of the simple productions
+        graph, following the components in reverse topological order, and
+        inserted all at once.
+        '''
+        graph = self._simple_graph()
         self._remove_simple_productions()
 
-        for symbol, simple in simple_table.items():
-            for non_terminal in simple:
-                for prod in self[non_terminal]:
-                    self.add_production(symbol, prod)
+        inherited = {}
+        new_prods = []
+        for component in strongly_connected_components(graph):
+            bodies = set()
+            for symbol in component:
+                bodies |= self.productions.bodies(symbol)
+                for succ in graph[symbol]:
+                    bodies.update(inherited.get(succ, ()))
+
+            for symbol in component:
+                inherited[symbol] = bodies
+                new_prods.extend(Prod(symbol, body) for body in bodies)
+
+        self.productions.update(new_prods)
 
+    @cached(copy=copy_dict, persist=True)
     def simple_table(self):
-        return { s: self._symbol_simple(s) for s in self.non_terminals }
+        '''
+        Gets, for each non terminal, the set of non terminals it derives only
+        through simple productions, itself included.
+
+        Non terminals in the same strongly connected component of the simple
+        productions graph share their set, which is built from the sets of
+        the components after it.
+        '''
+        graph = self._simple_graph()
+
+        table = {}
+        for component in strongly_connected_components(graph):
+            simple = set(component)
+            for symbol in component:
+                for succ in graph[symbol]:
+                    simple.update(table.get(succ, ()))
+
+            for symbol in component:
+                table[symbol] = simple
+
+        return table
+
+    def _simple_graph(self):
+        '''
+        Gets the graph that goes from each non terminal to the non terminals
+        of its simple productions.
+        '''
+        graph = { nt: set() for nt in self.non_terminals }
+        for non_term, prod in self.productions:
+            if non_term in graph and self._is_simple_prod(prod):
+                graph[non_term].add(prod[0])
+        return graph
 
     def remove_direct_left_recursion(self, symbol):
         direct = { p for p in self[symbol] if p[0] == symbol }
@@ -169,50 +528,210 @@ class Grammar(object):
         productive_symbols = self.productive()
         return self.start not in productive_symbols
 
+    @cached()
     def is_finite(self):
-        tmp_grammar = Grammar(
-            self.non_terminals.copy(),
-            self.terminals.copy(),
-            self.productions.copy(),
-            self.start)
+        return self.infinite_cycle() is None
+
+    @cached(persist=True)
+    def infinite_cycle(self):
+        '''
+        Gets a cycle of non terminals that makes the language infinite, as a
+        tuple where each one derives a sentential form with the next, and the
+        last one with the first. Returns None if the language is finite.
+
+        Once the grammar is proper, without epsilon and simple productions
+        or useless symbols, every cycle of the graph from each non terminal
+        to the non terminals of its productions pumps some terminals, so the
+        language is infinite if and only if the graph has a cycle. A single
+        pass over its strongly connected components finds one.
+        '''
+        tmp_grammar = self.copy()
+        # The intermediate grammars are thrown away, their results are not
+        # worth storing
+        tmp_grammar.disk_cache = None
 
         # Proper
         tmp_grammar.remove_epsilon()
         tmp_grammar.remove_simple()
         tmp_grammar.remove_useless()
 
+        non_terminals = tmp_grammar.non_terminals
+        graph = { nt: set() for nt in non_terminals }
+        for non_term, prod in tmp_grammar.productions:
+            if non_term in graph:
+                graph[non_term].update(s for s in prod if s in non_terminals)
 
-        for nt in tmp_grammar.non_terminals:
-            visited = set()
-            stack = [ nt ]
-            while len(stack) > 0:
-                item = stack.pop()
-                for prod in tmp_grammar[item]:
-                    non_term = set(prod) - tmp_grammar.terminals
-                    for n in non_term:
-                        if n in visited:
-                            return False
-                        visited.add(n)
-                        stack.append(n)
-        return True
+        for component in strongly_connected_components(graph):
+            symbol = component[0]
+            if len(component) > 1 or symbol in graph[symbol]:
+                return tuple(find_cycle(graph, symbol, set(component)))
+        return None
 
+    @cached(persist=True)
     def is_factored(self):
         '''
         Checks if the grammar is factored or not.
 
         It does so by intersecting the first sets of the productions of each
-        non terminal.
+        non terminal, with the non terminals that begin them, as grouped by
+        `_get_factors`: a group has more than one production as soon as two
+        of them share a symbol other than EPSILON.
         '''
-        factors = ( self._get_factors(n) for n in self.non_terminals )
-        for fact in factors:
-            factorables = filter(lambda f: len(f) > 1, fact)
-            factorables = list(factorables)
-            if factorables:
-                return False
+        first = self._first(False)
+        for nt in self.non_terminals:
+            seen = set()
+            for body in self[nt]:
+                keys = self._first_sequence(first, body) - Grammar._EPSILON_SET
+                if not seen.isdisjoint(keys):
+                    return False
+                seen |= keys
         return True
 
+    def left_factor(self, max_rounds=10):
+        '''
+        Left factors the grammar, in place, and returns a `FactorResult`.
+
+        Each round first looks, with the first sets computed once for the
+        whole round, for productions of a non terminal whose first sets
+        intersect without sharing a prefix, and replaces their leading non
+        terminal by its productions. Leading non terminals that may begin
+        with themselves or with the non terminal being factored are kept, as
+        expanding them would never end. Then every shared prefix is factored
+        in a single pass over the prefix trie of the productions of each non
+        terminal. Rounds go on until one changes nothing, or `max_rounds`.
+        '''
+        new_symbols = []
+        rounds = 0
+        while rounds < max_rounds:
+            first = self._first(True)
+            conflicts = {}
+            for nt in self.non_terminals:
+                groups = self._first_conflicts(nt)
+                if groups:
+                    conflicts[nt] = groups
+
+            changed = False
+            for nt, groups in conflicts.items():
+                for group in groups:
+                    changed |= self._expand_leading(nt, group, first)
+
+            for nt in list(self.non_terminals):
+                changed |= self._factor_prefixes(nt, new_symbols)
+
+            if not changed:
+                return FactorResult(rounds, new_symbols, not conflicts)
+            rounds += 1
+
+        factored = not any(self._first_conflicts(n) for n in self.non_terminals)
+        return FactorResult(rounds, new_symbols, factored)
+
+    def _first_conflicts(self, nt):
+        '''
+        Gets the groups of productions of the non terminal that are not
+        factored, that is, that share a terminal in their first sets or
+        begin with the same symbol.
+        '''
+        parent = {}
+
+        def find(body):
+            while parent[body] != body:
+                parent[body] = parent[parent[body]]
+                body = parent[body]
+            return body
+
+        owner = {}
+        for body in self[nt]:
+            parent[body] = body
+            keys = set(self.first_of(body))
+            keys.add(body[0])
+            keys.discard(Grammar.EPSILON)
+            for key in keys:
+                if key in owner:
+                    parent[find(body)] = find(owner[key])
+                else:
+                    owner[key] = body
+
+        groups = defaultdict(set)
+        for body in parent:
+            groups[find(body)].add(body)
+        return [ group for group in groups.values() if len(group) > 1 ]
+
+    def _expand_leading(self, nt, group, first):
+        '''
+        Replaces the leading non terminal of the productions of the group by
+        its productions, unless every production begins with the same
+        symbol. `first` are the first sets with non terminals, used to skip
+        left recursive non terminals. Returns if anything changed.
+        '''
+        if len({ body[0] for body in group }) == 1:
+            return False
+
+        changed = False
+        for body in group:
+            leading = body[0]
+            if leading not in self.non_terminals:
+                continue
+
+            begins = first[leading]
+            if leading == nt or nt in begins or leading in begins:
+                continue
+
+            self.productions.discard(Prod(nt, body))
+            for prod in self[leading]:
+                if prod == (Grammar.EPSILON,):
+                    prod = ()
+                new_body = prod + body[1:]
+                self.add_production(nt, new_body or (Grammar.EPSILON,))
+            changed = True
+
+        return changed
+
+    def _factor_prefixes(self, nt, new_symbols):
+        '''
+        Factors every prefix shared by productions of the non terminal.
+
+        The productions are split by their first symbol, which is one level
+        of their prefix trie. A branch with more than one production is
+        followed down while it does not split to get the shared prefix,
+        which goes to a new non terminal whose productions are the rest of
+        each branch, factored in turn. Returns if anything changed.
+        '''
+        changed = False
+        queue = deque([ nt ])
+        while queue:
+            head = queue.popleft()
+            branches = defaultdict(list)
+            for body in self[head]:
+                if body != (Grammar.EPSILON,):
+                    branches[body[0]].append(body)
+
+            for bodies in branches.values():
+                if len(bodies) < 2:
+                    continue
+
+                prefix = 1
+                shortest = min(len(body) for body in bodies)
+                while (prefix < shortest
+                        and len({ body[prefix] for body in bodies }) == 1):
+                    prefix += 1
+
+                new_nt = self._get_next_nt(nt)
+                self.non_terminals.add(new_nt)
+                new_symbols.append(new_nt)
+
+                for body in bodies:
+                    self.productions.discard(Prod(head, body))
+                    self.add_production(
+                        new_nt, body[prefix:] or (Grammar.EPSILON,))
+                self.add_production(head, bodies[0][:prefix] + (new_nt,))
+
+                queue.append(new_nt)
+                changed = True
+
+        return changed
+
     def factor(self, steps=1):
-        grammar = deepcopy(self)
+        grammar = self.copy()
 
         while steps:
             factors = {}
@@ -235,16 +754,19 @@ class Grammar(object):
         '''
         Gets the productions by a non-terminal that can be factored.
         '''
-        first = self.first_sets()
+        # The first sets of the bodies include the non terminals that begin
+        # them, so bodies starting with the same non terminal are grouped
+        first = self._first(False)
         prods = self[nt]
+        first_sets = { p: self._first_sequence(first, p) for p in prods }
         factors = []
 
         while prods:
             p1 = prods.pop()
             prod_set = set([ p1 ])
-            p1_set = self._first_sequence(first, p1)
+            p1_set = first_sets[p1]
             for p2 in prods:
-                p2_set = self._first_sequence(first, p2)
+                p2_set = first_sets[p2]
                 intersection = (p1_set & p2_set) - { Grammar.EPSILON }
                 if intersection:
                     prod_set.add(p2)
@@ -302,199 +824,359 @@ class Grammar(object):
 
     def _get_next_nt(self, nt):
         '''
-        Gets the next possible non-terminal to be created.
+        Gets the next possible non-terminal to be created, see
+        `NameAllocator`.
         '''
-        nt = nt[0]
-
-        non_terminals = { n for n in self.non_terminals if len(n) > 1 }
-        non_terminals = { n for n in non_terminals if n[0] == nt }
-
-        counter = 0
-        while True:
-            new_nt = f'{nt}{counter}'
-            if new_nt not in non_terminals:
-                return new_nt
-            counter += 1
+        return self._names.fresh(nt, self.non_terminals, self.terminals)
 
+    @cached(copy=set, persist=True)
     def productive(self):
         '''
         Gets the set of productive symbols of the grammar.
         '''
-        old_set = set()
-        while True:
-            # Ni
-            new_set = set()
+        return self._derivable(self.terminals | { Grammar.EPSILON })
 
-            # (Ni-1 U Vt)*
-            union = old_set | self.terminals | { Grammar.EPSILON }
+    @cached(persist=True)
+    def nullable(self):
+        '''
+        Gets the set of non terminal symbols that derive EPSILON in 0 or more
+        derivations. Only the productions of declared non terminals count, as
+        for the first and follow sets.
+        '''
+        analysis = self._analysis()
+        if analysis is not None:
+            return frozenset(analysis.nullable)
+        return frozenset(self._derivable(
+            { Grammar.EPSILON }, self.terminals, self.non_terminals))
+
+    def _derivable(self, resolved, blocked=(), heads=None):
+        '''
+        Gets the set of non terminals that derive a sequence made only of
+        symbols in `resolved`. Productions with a symbol in `blocked` are
+        never used, and if `heads` is given only the productions of those
+        non terminals are.
+
+        Each production keeps a counter of the symbols of its body that are
+        not known to be derivable yet. When a symbol becomes derivable the
+        counters of the productions waiting for it are decremented, and the
+        non terminal of a production whose counter reaches zero becomes
+        derivable too.
+        '''
+        # isdisjoint only iterates the smaller set when both are exact sets,
+        # not for a SymbolSet
+        blocked = frozenset(blocked)
 
-            for (non_term, prod) in self.productions:
-                # alpha contained in (Ni-1 U Vt)*
-                if set(prod) <= union:
-                    new_set.add(non_term)
+        counters = {}
+        waiting = defaultdict(list)
+        queue = deque()
+        derivable = set()
 
-            # Ni-1 U new_set
-            new_set |= old_set
+        for prod in self.productions:
+            if heads is not None and prod.n not in heads:
+                continue
 
-            if new_set == old_set:
-                break
+            pending = set(prod.p) - resolved
+            if not pending.isdisjoint(blocked):
+                continue
 
-            old_set = new_set
+            counters[prod] = len(pending)
+            for symbol in pending:
+                waiting[symbol].append(prod)
 
-        return old_set
+            if not pending and prod.n not in derivable:
+                derivable.add(prod.n)
+                queue.append(prod.n)
 
+        while queue:
+            symbol = queue.popleft()
+            for prod in waiting.pop(symbol, ()):
+                counters[prod] -= 1
+                if counters[prod] == 0 and prod.n not in derivable:
+                    derivable.add(prod.n)
+                    queue.append(prod.n)
+
+        return derivable
+
+    @cached(copy=set)
     def reachable(self, symbol):
         '''
         Gets the set of reachable symbols from the symbol.
         '''
-        # (Vn U Vt)*
-        union = self.non_terminals | self.terminals | { Grammar.EPSILON }
-
-        old_set = { symbol }
-        while True:
-            # Ni
-            new_set = set()
-
-            for non_term, prod in self.productions:
-                # A in Vi-1
-                if non_term not in old_set:
-                    continue
+        graph = self._symbol_graph()
 
-                # alpha, beta contained in (Vn U Vt)*
-                new_set |= set(prod)
+        reachable = { symbol }
+        queue = deque([ symbol ])
+        while queue:
+            current = queue.popleft()
+            for next_symbol in graph.get(current, ()):
+                if next_symbol not in reachable:
+                    reachable.add(next_symbol)
+                    queue.append(next_symbol)
 
-            # Ni-1 U new_set
-            new_set |= old_set
+        return reachable
 
-            if new_set == old_set:
-                break
-
-            old_set = new_set
+    @cached()
+    def _symbol_graph(self):
+        '''
+        Gets the graph that goes from each non terminal to the symbols in its
+        productions.
 
-        return old_set
+        The graph is kept until the grammar changes, so it is shared by every
+        analysis done over the same grammar.
+        '''
+        graph = {}
+        for prod in self.productions:
+            graph.setdefault(prod.n, set()).update(prod.p)
+        return graph
 
     def first_sets(self):
-        first = self._first()
-        for val in first.values():
-            val -= self.non_terminals
-        return first
+        return copy_dict(self._first(False))
 
     def first_NT(self):
-        first = self._first()
-        for first_set in first.values():
-            first_set -= self.terminals | { Grammar.EPSILON }
+        first = self._first(True)
+        terminals = self.terminals | { Grammar.EPSILON }
+        return {
+            symbol: first_set - terminals
+            for symbol, first_set in first.items()
+            if symbol not in self.terminals
+        }
+
+    @cached(persist=True)
+    def _first(self, non_terminals=True):
+        '''
+        Gets the first set of every symbol. If `non_terminals` is true, the
+        sets also include the non terminals that may begin each non terminal.
+
+        A non terminal depends on the non terminals that can begin its
+        productions. The dependency graph is split into strongly connected
+        components, which are visited in reverse topological order, so each
+        component is computed only once from the components it depends on.
+        '''
+        analysis = self._analysis()
+        if analysis is not None and not non_terminals:
+            return analysis.first
+
+        nullable = self.nullable() & self.non_terminals
+        depends = self._begins_with(nullable)
+
+        seeds = { symbol: set() for symbol in self.non_terminals }
+        for symbol in nullable:
+            seeds[symbol].add(Grammar.EPSILON)
+
+        for non_term, prod in self.productions:
+            if non_term not in seeds:
+                continue
+
+            for symbol in self._left_corners(prod, nullable):
+                if non_terminals or symbol not in self.non_terminals:
+                    seeds[non_term].add(symbol)
+
+        first = { symbol: { symbol } for symbol in self.terminals }
+        for component in strongly_connected_components(depends):
+            first_set = set()
+            for symbol in component:
+                first_set |= seeds[symbol]
+                for dep in depends[symbol]:
+                    if dep in first:
+                        first_set |= first[dep]
+            first_set.discard(Grammar.EPSILON)
+
+            for symbol in component:
+                first[symbol] = set(first_set)
+                if Grammar.EPSILON in seeds[symbol]:
+                    first[symbol].add(Grammar.EPSILON)
 
-        for symbol in self.terminals:
-            first.pop(symbol)
         return first
 
-    def _first(self):
-        first_dict = defaultdict(set)
-        # Rule 1
-        for symbol in self.terminals:
-            first_dict[symbol].add(symbol)
+    def _begins_with(self, nullable):
+        '''
+        Gets the graph that goes from each non terminal to the non terminals
+        that may begin one of its productions.
+        '''
+        depends = { symbol: set() for symbol in self.non_terminals }
+        for non_term, prod in self.productions:
+            if non_term not in depends:
+                continue
 
-        while True:
-            new_dict = deepcopy(first_dict)
+            for symbol in self._left_corners(prod, nullable):
+                if symbol in self.non_terminals:
+                    depends[non_term].add(symbol)
 
-            for symbol in self.non_terminals:
-                productions = self[symbol]
+        return depends
 
-                # Rule 2
-                to_discard = set()
-                for prod in productions:
-                    first = prod[0]
-                    if first in self.terminals:
-                        new_dict[symbol].add(first)
-                        to_discard.add(prod)
-                productions -= to_discard
+    @staticmethod
+    def _left_corners(prod, nullable):
+        '''
+        Yields the symbols of the production that may be the first one
+        derived, that is, every symbol preceded only by nullable symbols.
+        '''
+        for symbol in prod:
+            yield symbol
+            if symbol not in nullable:
+                break
 
-                # Rule 3
-                for prod in productions:
-                    first_seq = self._first_sequence(new_dict, prod)
-                    new_dict[symbol] |= first_seq
+    def first_of(self, sequence):
+        '''
+        Gets the first set of a sequence of symbols.
 
-            if new_dict == first_dict:
-                break
+        The first sets of every suffix of the sequence are kept in a table,
+        so asking again for the sequence, or for any production body, does
+        not compute it again while the grammar does not change.
+        '''
+        sequence = tuple(sequence)
+        if not sequence:
+            return Grammar._EPSILON_SET
+        return self._suffix_first(sequence)[0]
 
-            first_dict = new_dict
+    def _suffix_first(self, sequence):
+        '''
+        Gets a list with the first set of each suffix of the sequence, that
+        is, the item at offset i is the first set of sequence[i:].
 
-        return dict(first_dict)
+        The list is computed right to left once per sequence and memoized.
+        '''
+        first, nullable, table = self._first_table()
+
+        suffixes = table.get(sequence)
+        if suffixes is not None:
+            return suffixes
+
+        suffixes = [ None ] * len(sequence)
+        after = Grammar._EPSILON_SET
+        for i in range(len(sequence) - 1, -1, -1):
+            symbol = sequence[i]
+            if symbol == Grammar.EPSILON:
+                pass
+            elif symbol not in nullable:
+                after = first.get(symbol, frozenset())
+            elif after is Grammar._EPSILON_SET:
+                after = first[symbol]
+            elif not nullable[symbol] <= after:
+                after = nullable[symbol] | after
+            suffixes[i] = after
+
+        table[sequence] = suffixes
+        return suffixes
+
+    @cached()
+    def _first_table(self):
+        '''
+        Gets the frozen first sets, a dict from each nullable non terminal to
+        its first set without EPSILON, and the table of suffix first sets.
 
+        They are built again only when the grammar changes.
+        '''
+        first = self._first(False)
+        first = { k: frozenset(v) for k, v in first.items() }
+        nullable = {
+            symbol: first[symbol] - Grammar._EPSILON_SET
+            for symbol in self.nullable() & self.non_terminals
+        }
+        return first, nullable, {}
+
+    @cached(copy=copy_dict, persist=True)
     def follow_sets(self):
-        follow = defaultdict(set)
-        first = self.first_sets()
-
-        while True:
-            new_follow = deepcopy(follow)
+        '''
+        Gets the follow set of every non terminal.
+
+        A single pass over the productions collects, for each symbol, the
+        terminals that follow it directly, and which follow sets must be
+        contained in others (FOLLOW(A) in FOLLOW(B) when B ends a production
+        of A), using the first sets of the production suffixes. The
+        containment graph is then propagated once per strongly connected
+        component, in topological order.
+        '''
+        analysis = self._analysis()
+        if analysis is not None:
+            return analysis.follow
 
-            for nt in self.non_terminals:
+        follow = { nt: set() for nt in self.non_terminals }
+        contains = { nt: set() for nt in self.non_terminals }
 
-                # Rule 1
-                if nt == self.start:
-                    new_follow[nt].add(Grammar.FINISH)
+        # Rule 1
+        if self.start in follow:
+            follow[self.start].add(Grammar.FINISH)
+
+        terminals = self.terminals | { Grammar.EPSILON }
+        for non_term, prod in self.productions:
+            # Only productions of declared non terminals count, `follow` also
+            # gets the symbols found in the bodies
+            if non_term not in contains:
+                continue
+
+            suffixes = self._suffix_first(prod)
+            last = len(prod) - 1
+            for i, symbol in enumerate(prod):
+                if symbol in terminals:
+                    continue
 
-                productions = self[nt]
+                follow_set = follow.setdefault(symbol, set())
+                if i == last:
+                    # Rule 3
+                    contains[non_term].add(symbol)
+                    continue
 
                 # Rule 2
-                for prod in productions:
-                    seq = list(prod)
-                    while seq:
-                        symbol = seq.pop(0)
-                        # Go until the second-to-last symbol
-                        if not seq:
-                            break
-
-                        if symbol in self.terminals:
-                            continue
-
-                        seq_first = self._first_sequence(first, seq)
-                        new_follow[symbol] |= seq_first - self.non_terminals
+                after = suffixes[i + 1]
+                follow_set |= after
 
                 # Rule 3
-                for prod in productions:
-                    seq = list(prod)
-                    while seq:
-                        symbol = seq.pop(0)
-                        if symbol in self.terminals | { Grammar.EPSILON }:
-                            continue
-
-                        if not seq:
-                            new_follow[symbol] |= new_follow[nt]
-                            break
-
-                        if Grammar.EPSILON in self._first_sequence(first, seq):
-                            new_follow[symbol] |= new_follow[nt]
-
-
-            if new_follow == follow:
-                break
-
-            follow = new_follow
-
-        # We add EPSILON for simplicity, but it does not make much sense, so
-        # we filter it out
-        for val in follow.values():
-            val.discard(Grammar.EPSILON)
+                if Grammar.EPSILON in after:
+                    follow_set.discard(Grammar.EPSILON)
+                    contains[non_term].add(symbol)
+
+        components = list(strongly_connected_components(contains, follow))
+        for component in reversed(components):
+            component = set(component)
+            follow_set = set()
+            for symbol in component:
+                follow_set |= follow[symbol]
+
+            for symbol in component:
+                follow[symbol] = set(follow_set)
+                for succ in contains.get(symbol, ()):
+                    if succ not in component:
+                        follow[succ] |= follow_set
+
+        return follow
+
+    @cached()
+    def bitsets(self):
+        '''
+        Gets the first and follow sets stored as int bitmasks, see
+        `BitsetAnalysis`. They convert back to dicts of sets with its
+        `first_sets` and `follow_sets`.
+        '''
+        return BitsetAnalysis(self)
 
-        return dict(follow)
+    @cached()
+    def ll1_table(self):
+        '''
+        Gets the LL(1) predictive parse table, with the report of its
+        conflicts, see `LL1Table`. It is built from the bitsets of the first
+        and follow sets in a single pass over the productions.
+        '''
+        return LL1Table(self)
 
     def _first_sequence(self, first, sequence):
+        '''
+        Gets the first set of the sequence from the `first` dict, including
+        the non terminals that begin the sequence.
+        '''
         first_set = set()
-        seq = list(sequence)
-        while seq:
-            symbol = seq.pop(0)
-
-            if symbol in self.terminals | { Grammar.EPSILON }:
+        last = len(sequence) - 1
+        for i, symbol in enumerate(sequence):
+            if symbol in self.terminals or symbol == Grammar.EPSILON:
                 first_set.add(symbol)
                 break
 
-            first_set |= first[symbol]
+            symbol_first = first[symbol]
+            first_set |= symbol_first
             first_set.add(symbol)
-            if Grammar.EPSILON not in first[symbol]:
+            if Grammar.EPSILON not in symbol_first:
                 break
 
-            if seq:
+            if i < last:
                 first_set.discard(Grammar.EPSILON)
 
         return first_set
@@ -503,6 +1185,7 @@ class Grammar(object):
         direct = self._get_direct_left()
         return len(direct) > 0
 
+    @cached(copy=set)
     def _get_direct_left(self):
         return { p.n for p in self.productions if p.n == p.p[0] }
 
@@ -510,20 +1193,36 @@ class Grammar(object):
         indirect = self._get_indirect_left()
         return len(indirect) > 0
 
+    @cached(copy=set, persist=True)
     def _get_indirect_left(self):
-        indirect = set()
-        first = self._first()
+        '''
+        Gets the non terminals with indirect left recursion.
 
-        for nt in self.non_terminals:
-            not_direct = { p for p in self[nt] if p[0] != nt }
+        A non terminal A is in the begins-with graph of each non terminal B
+        that may begin one of its productions, so B derives A at the left only
+        when both are in the same strongly connected component.
+        '''
+        nullable = self.nullable() & self.non_terminals
+        depends = self._begins_with(nullable)
 
-            for prod in not_direct:
-                prod_first = self._first_sequence(first, prod)
-                if nt in prod_first:
+        component_of = {}
+        for i, component in enumerate(strongly_connected_components(depends)):
+            for symbol in component:
+                component_of[symbol] = i
+
+        indirect = set()
+        for nt, prod in self.productions:
+            if nt not in depends or prod[0] == nt:
+                continue
+
+            for symbol in self._left_corners(prod, nullable):
+                if component_of.get(symbol) == component_of[nt]:
                     indirect.add(nt)
+                    break
 
         return indirect
 
+    @cached(persist=True)
     def has_left_recursion(self):
         direct = self._get_direct_left()
         indirect = self._get_indirect_left()
@@ -533,7 +1232,8 @@ class Grammar(object):
     def epsilon_combinations(prod, epsilon_set):
         '''
         Used internally to get the indexes of the non terminals that must be
-        removed when removing epsilon.
+        removed when removing epsilon. `epsilon_set` is the set of nullable
+        symbols.
 
         It takes the positions of each symbol that is in the set and makes all
         the possible combinations of it.
@@ -543,7 +1243,7 @@ class Grammar(object):
         # Gets symbols and indexes
         epsilon_positions = []
         for i, item in enumerate(production):
-            if (item,) in epsilon_set:
+            if item in epsilon_set:
                 epsilon_positions.append((i, item))
 
         # All possible combinations
@@ -552,44 +1252,19 @@ class Grammar(object):
                 yield item
 
     def _remove_productions_with_symbol(self, symbol):
-        # We use a list here because we cannot change set size while iterating
-        # over it
-        prods_to_remove = []
-        for prod in self.productions:
-            if prod.n == symbol or symbol in prod.p:
-                prods_to_remove.append(prod)
-
-        for prod in prods_to_remove:
+        removed = self.productions.occurrences(symbol)
+        for prod in removed:
             self.productions.discard(prod)
+        return removed
 
     def _epsilon_closure(self):
         '''
         Gets the non terminal symbols that derive EPSILON in 0 or more
-        derivations
-        '''
-        old_set = set()
-        while True:
-            # Ni
-            new_set = set()
-
-            # (Ni-1 U epsilon)*
-            union = old_set | { (Grammar.EPSILON,) }
-
-            for (non_term, prod) in self.productions:
-                prods = ( (i,) for i in prod )
-                # alpha contained in (Ni-1 U Vt)*
-                if set(prods) <= union:
-                    new_set.add((non_term,))
-
-            # Ni-1 U new_set
-            new_set |= old_set
-
-            if new_set == old_set:
-                break
+        derivations, each one inside a tuple.
 
-            old_set = new_set
-
-        return old_set
+        Kept for compatibility, use `nullable` instead.
+        '''
+        return { (symbol,) for symbol in self.nullable() }
 
     def _remove_simple_productions(self):
         '''
@@ -641,12 +1316,25 @@ class Grammar(object):
         return line
 
     def __eq__(self, other):
+        if not isinstance(other, Grammar):
+            return NotImplemented
+
+        # Only different fingerprints are conclusive, equal ones could be
+        # forged, as the digests are sums
+        if self.fingerprint() != other.fingerprint():
+            return False
+
         vnt = self.non_terminals == other.non_terminals
         vt = self.terminals == other.terminals
         prods = self.productions == other.productions
         start = self.start == other.start
         return vnt and vt and prods and start
 
+    def __hash__(self):
+        # Changes with the grammar, so a grammar must not be changed while it
+        # is in a set or is a dict key
+        return hash(self.fingerprint())
+
     def __str__(self):
         lines = [ self._to_line(self.start) ]
         for non_terminal in self.non_terminals - { self.start }:
@@ -657,7 +1345,7 @@ class Grammar(object):
 
     def __getitem__(self, nt):
         '''
-        Returns a list of the productions from the passed non terminal.
+        Returns a set with the productions from the passed non terminal.
         '''
-        return { p for n, p in self.productions if n == nt }
+        return self.productions.bodies(nt)
 
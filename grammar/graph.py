@@ -0,0 +1,84 @@
+'''
+Graph algorithms used by the grammar analyses.
+
+Graphs are dicts that map each node to an iterable of its successors. Nodes
+that are not keys of the dict have no successors.
+'''
+
+
+def strongly_connected_components(graph, nodes=None):
+    '''
+    Yields the strongly connected components of the graph as lists.
+
+    Uses an iterative version of Tarjan's algorithm, so deep graphs do not
+    hit the recursion limit. The components come in reverse topological
+    order: a component is only yielded after every component reachable from
+    it.
+    '''
+    if nodes is None:
+        nodes = graph.keys()
+
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+
+    for root in nodes:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [ (root, iter(graph.get(root, ()))) ]
+
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = lowlink[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph.get(succ, ()))))
+                    break
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    yield component
+
+
+def find_cycle(graph, node, nodes=None):
+    '''
+    Gets a shortest cycle through the node as a list of nodes, where each
+    one has an edge to the next and the last has an edge to the first, or
+    None if there is no such cycle. If given, only `nodes` are visited.
+    '''
+    parent = { node: None }
+    queue = [ node ]
+    for current in queue:
+        for succ in graph.get(current, ()):
+            if succ == node:
+                cycle = []
+                while current is not None:
+                    cycle.append(current)
+                    current = parent[current]
+                cycle.reverse()
+                return cycle
+
+            if succ not in parent and (nodes is None or succ in nodes):
+                parent[succ] = current
+                queue.append(succ)
+    return None
@@ -0,0 +1,460 @@
+from collections import defaultdict, deque
+
+from grammar.graph import strongly_connected_components
+
+EPSILON = '&'
+FINISH = '$'
+
+
+class IncrementalAnalysis(object):
+    '''
+    Nullable, first and follow sets of a grammar that are kept up to date
+    while productions are added and removed, instead of being computed again
+    from scratch.
+
+    Adding productions only adds facts, which are propagated from the
+    productions that changed. Removing productions follows the
+    delete-and-rederive approach: every set that may depend on the removed
+    productions is dropped and derived again, one strongly connected
+    component at a time, from the sets that could not have changed.
+
+    Attributes:
+        nullable: Set of nullable non terminals.
+        first: Dict from each terminal and non terminal to its first set.
+        follow: Dict from each symbol to its follow set.
+        version: Version of the grammar the sets correspond to.
+    '''
+
+    def __init__(self, grammar):
+        super(IncrementalAnalysis, self).__init__()
+        self.grammar = grammar
+        self.rebuild()
+
+    def rebuild(self):
+        '''
+        Computes every set from scratch.
+        '''
+        grammar = self.grammar
+        self.non_terminals = set(grammar.non_terminals)
+        self.terminals = set(grammar.terminals)
+        self.start = grammar.start
+
+        self.nullable = set()
+        self.first = { t: { t } for t in self.terminals }
+        self.first.update({ nt: set() for nt in self.non_terminals })
+        self.follow = {}
+
+        productions = [
+            p for p in grammar.productions if p.n in self.non_terminals
+        ]
+        symbols = set(self.non_terminals)
+        for prod in productions:
+            symbols.update(s for s in prod.p if self._has_follow(s))
+
+        self._rederive_nullable(self.non_terminals)
+        self._rederive_first(self.non_terminals)
+        self._rederive_follow(symbols, productions)
+        self._stamp()
+
+    def sync(self):
+        '''
+        Checks if the sets still correspond to the grammar.
+
+        Symbols added to the grammar that are not used by any production yet
+        are taken in without computing anything again. Any other change not
+        made through `add` or `remove` makes the sets out of date.
+        '''
+        grammar = self.grammar
+        if self.version == grammar.version:
+            return True
+
+        if (grammar.productions.version != self._productions_version
+                or grammar.start != self.start):
+            return False
+
+        if not (self.non_terminals <= grammar.non_terminals
+                and self.terminals <= grammar.terminals):
+            return False
+
+        new_non_terminals = grammar.non_terminals - self.non_terminals
+        new_terminals = grammar.terminals - self.terminals
+        for symbol in new_non_terminals | new_terminals:
+            if grammar.productions.occurrences(symbol):
+                return False
+
+        for symbol in new_non_terminals:
+            self.non_terminals.add(symbol)
+            self.first[symbol] = set()
+            self.follow[symbol] = set()
+            if symbol == self.start:
+                self.follow[symbol].add(FINISH)
+
+        for symbol in new_terminals:
+            self.terminals.add(symbol)
+            self.first[symbol] = { symbol }
+
+        self._stamp()
+        return True
+
+    def add(self, productions):
+        '''
+        Updates the sets after the productions were added to the grammar.
+        '''
+        productions = [
+            p for p in productions if p.n in self.non_terminals
+        ]
+
+        # Nullable
+        newly_nullable = set()
+        queue = deque()
+        for prod in productions:
+            if prod.n not in self.nullable and self._all_nullable(prod.p):
+                self._add_nullable(prod.n, newly_nullable, queue)
+
+        while queue:
+            symbol = queue.popleft()
+            for prod in self.grammar.productions.occurrences(symbol):
+                if (prod.n in self.non_terminals
+                        and prod.n not in self.nullable
+                        and symbol in prod.p
+                        and self._all_nullable(prod.p)):
+                    self._add_nullable(prod.n, newly_nullable, queue)
+
+        # First
+        changed = set(newly_nullable)
+        affected = set(productions)
+        for symbol in newly_nullable:
+            affected |= self.grammar.productions.occurrences(symbol)
+
+        for prod in affected:
+            if prod.n in self.non_terminals:
+                first = set()
+                for symbol in self._left_corners(prod.p):
+                    first |= self._first_of(symbol)
+                self._grow_first(prod.n, first, queue, changed)
+
+        while queue:
+            symbol, delta = queue.popleft()
+            delta = delta - { EPSILON }
+            for prod in self.grammar.productions.occurrences(symbol):
+                if (prod.n in self.non_terminals
+                        and symbol in self._left_corners(prod.p)):
+                    self._grow_first(prod.n, delta, queue, changed)
+
+        # Follow
+        for symbol in changed:
+            affected |= self.grammar.productions.occurrences(symbol)
+
+        for prod in affected:
+            if prod.n not in self.non_terminals:
+                continue
+
+            for symbol, after, nullable_after in self._suffixes(prod.p):
+                self._grow_follow(symbol, after, queue)
+                if nullable_after:
+                    self._grow_follow(symbol, self.follow[prod.n], queue)
+
+        while queue:
+            symbol, delta = queue.popleft()
+            for succ in self._follow_successors(symbol, self.nullable):
+                self._grow_follow(succ, delta, queue)
+
+        self._stamp()
+
+    def remove(self, productions):
+        '''
+        Updates the sets after the productions were removed from the grammar.
+        '''
+        productions = [
+            p for p in productions if p.n in self.non_terminals
+        ]
+        occurrences = self.grammar.productions.occurrences
+        old_nullable = set(self.nullable)
+
+        # Nullable
+        roots = {
+            p.n for p in productions
+            if p.n in self.nullable and self._all_nullable(p.p)
+        }
+        suspects = self._closure(roots, lambda symbol: (
+            p.n for p in occurrences(symbol)
+            if p.n in self.nullable and symbol in p.p
+        ))
+        self.nullable -= suspects
+        self._rederive_nullable(suspects)
+        lost = old_nullable - self.nullable
+
+        # First
+        roots = { p.n for p in productions } | lost
+        suspects = self._closure(roots, lambda symbol: (
+            p.n for p in occurrences(symbol)
+            if p.n in self.non_terminals
+            and symbol in self._left_corners(p.p, old_nullable)
+        ))
+        old_first = { symbol: self.first[symbol] for symbol in suspects }
+        self._rederive_first(suspects)
+        changed = lost | {
+            symbol for symbol in suspects
+            if self.first[symbol] != old_first[symbol]
+        }
+
+        # Follow
+        roots = set()
+        for prod in productions:
+            roots.update(s for s in prod.p if self._has_follow(s))
+        for symbol in changed:
+            for prod in occurrences(symbol):
+                if prod.n in self.non_terminals:
+                    roots.update(s for s in prod.p if self._has_follow(s))
+
+        suspects = self._closure(
+            roots,
+            lambda symbol: self._follow_successors(symbol, old_nullable))
+        affected = set()
+        for symbol in suspects:
+            affected |= occurrences(symbol)
+        affected = [ p for p in affected if p.n in self.non_terminals ]
+        self._rederive_follow(suspects, affected)
+
+        self._stamp()
+
+    def remove_symbol(self, symbol, productions):
+        '''
+        Updates the sets after the symbol and the productions that used it
+        were removed from the grammar.
+        '''
+        self.remove(productions)
+
+        self.non_terminals.discard(symbol)
+        self.terminals.discard(symbol)
+        self.nullable.discard(symbol)
+        self.first.pop(symbol, None)
+        self.follow.pop(symbol, None)
+        self._stamp()
+
+    def _stamp(self):
+        self.version = self.grammar.version
+        self._productions_version = self.grammar.productions.version
+
+    def _has_follow(self, symbol):
+        return symbol not in self.terminals and symbol != EPSILON
+
+    def _all_nullable(self, body):
+        return all(s == EPSILON or s in self.nullable for s in body)
+
+    def _first_of(self, symbol):
+        '''
+        Gets what the symbol adds to the first set of a production where it
+        is a left corner.
+        '''
+        if symbol in self.non_terminals:
+            return self.first[symbol] - { EPSILON }
+        return { symbol }
+
+    def _left_corners(self, body, nullable=None):
+        '''
+        Gets the symbols of the body preceded only by nullable symbols.
+        '''
+        if nullable is None:
+            nullable = self.nullable
+
+        corners = []
+        for symbol in body:
+            corners.append(symbol)
+            if symbol not in nullable:
+                break
+        return corners
+
+    def _suffixes(self, body):
+        '''
+        Yields each symbol of the body that has a follow set, with the first
+        set of the symbols after it and whether they are all nullable.
+        '''
+        after = set()
+        nullable_after = True
+        for symbol in reversed(body):
+            if symbol == EPSILON:
+                continue
+
+            if self._has_follow(symbol):
+                yield symbol, after, nullable_after
+
+            if symbol in self.nullable:
+                after = after | self.first[symbol]
+                after.discard(EPSILON)
+            else:
+                after = set(self.first.get(symbol, ()))
+                after.discard(EPSILON)
+                nullable_after = False
+
+    def _follow_successors(self, symbol, nullable):
+        '''
+        Gets the symbols whose follow set contains the follow set of the
+        symbol, that is, the ones that end one of its productions.
+        '''
+        if symbol not in self.non_terminals:
+            return
+
+        for body in self.grammar.productions.bodies(symbol):
+            for succ in reversed(body):
+                if self._has_follow(succ):
+                    yield succ
+                if succ != EPSILON and succ not in nullable:
+                    break
+
+    def _add_nullable(self, symbol, newly_nullable, queue):
+        self.nullable.add(symbol)
+        self.first[symbol].add(EPSILON)
+        newly_nullable.add(symbol)
+        queue.append(symbol)
+
+    def _grow_first(self, symbol, first, queue, changed):
+        delta = first - self.first[symbol]
+        if delta:
+            self.first[symbol] |= delta
+            changed.add(symbol)
+            queue.append((symbol, delta))
+
+    def _grow_follow(self, symbol, follow, queue):
+        follow_set = self.follow.setdefault(symbol, set())
+        delta = follow - follow_set
+        if delta:
+            follow_set |= delta
+            queue.append((symbol, delta))
+
+    @staticmethod
+    def _closure(roots, successors):
+        '''
+        Gets the set of symbols reachable from the roots.
+        '''
+        closure = set(roots)
+        queue = deque(roots)
+        while queue:
+            symbol = queue.popleft()
+            for succ in successors(symbol):
+                if succ not in closure:
+                    closure.add(succ)
+                    queue.append(succ)
+        return closure
+
+    def _rederive_nullable(self, suspects):
+        '''
+        Finds which of the suspect non terminals are nullable, knowing the
+        other non terminals are already right.
+        '''
+        counters = {}
+        waiting = defaultdict(list)
+        queue = deque()
+
+        for symbol in suspects:
+            for body in self.grammar.productions.bodies(symbol):
+                pending = set(body) - self.nullable - { EPSILON }
+                if not pending <= suspects:
+                    continue
+
+                if not pending:
+                    if symbol not in self.nullable:
+                        self.nullable.add(symbol)
+                        queue.append(symbol)
+                    continue
+
+                key = (symbol, body)
+                counters[key] = len(pending)
+                for pending_symbol in pending:
+                    waiting[pending_symbol].append(key)
+
+        while queue:
+            symbol = queue.popleft()
+            for key in waiting.pop(symbol, ()):
+                counters[key] -= 1
+                if counters[key] == 0 and key[0] not in self.nullable:
+                    self.nullable.add(key[0])
+                    queue.append(key[0])
+
+    def _rederive_first(self, suspects):
+        '''
+        Computes the first sets of the suspect non terminals, knowing the
+        other first sets are already right.
+        '''
+        seeds = {}
+        depends = {}
+        epsilon = set()
+        for symbol in suspects:
+            seeds[symbol] = set()
+            depends[symbol] = set()
+            if symbol in self.nullable:
+                epsilon.add(symbol)
+
+            for body in self.grammar.productions.bodies(symbol):
+                for corner in self._left_corners(body):
+                    if corner in suspects:
+                        depends[symbol].add(corner)
+                    elif corner in self.non_terminals:
+                        seeds[symbol] |= self.first[corner]
+                    elif corner == EPSILON:
+                        epsilon.add(symbol)
+                    else:
+                        seeds[symbol].add(corner)
+
+        for component in strongly_connected_components(depends):
+            members = set(component)
+            first_set = set()
+            for symbol in component:
+                first_set |= seeds[symbol]
+                for dep in depends[symbol]:
+                    if dep not in members:
+                        first_set |= self.first[dep]
+            first_set.discard(EPSILON)
+
+            for symbol in component:
+                self.first[symbol] = set(first_set)
+                if symbol in epsilon:
+                    self.first[symbol].add(EPSILON)
+
+    def _rederive_follow(self, suspects, productions):
+        '''
+        Computes the follow sets of the suspect symbols, knowing the other
+        follow sets are already right. `productions` must hold every
+        production where a suspect symbol appears.
+        '''
+        contains = {}
+        for symbol in suspects:
+            self.follow[symbol] = set()
+            contains[symbol] = set()
+
+        if self.start in suspects and self.start in self.non_terminals:
+            self.follow[self.start].add(FINISH)
+
+        used = set()
+        for prod in productions:
+            for symbol, after, nullable_after in self._suffixes(prod.p):
+                if symbol not in suspects:
+                    continue
+
+                used.add(symbol)
+                self.follow[symbol] |= after
+                if not nullable_after:
+                    continue
+
+                if prod.n in suspects:
+                    contains[prod.n].add(symbol)
+                else:
+                    self.follow[symbol] |= self.follow[prod.n]
+
+        components = list(strongly_connected_components(contains))
+        for component in reversed(components):
+            members = set(component)
+            follow_set = set()
+            for symbol in component:
+                follow_set |= self.follow[symbol]
+
+            for symbol in component:
+                self.follow[symbol] = set(follow_set)
+                for succ in contains[symbol]:
+                    if succ not in members:
+                        self.follow[succ] |= follow_set
+
+        # Symbols that are not non terminals only have a follow set while
+        # some production uses them
+        for symbol in suspects - used - self.non_terminals:
+            del self.follow[symbol]
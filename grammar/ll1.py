@@ -0,0 +1,155 @@
+from array import array
+from collections import namedtuple
+
+from grammar.production import Prod
+
+EPSILON = '&'
+
+'''
+Conflict of an LL(1) table.
+
+Attributes:
+    kind: 'FIRST/FIRST' when the productions begin with the same terminal, or
+        all derive EPSILON, and 'FIRST/FOLLOW' when some begin with the
+        terminal and others derive EPSILON and it follows the non terminal.
+    non_terminal: Row of the conflict.
+    terminal: Column of the conflict.
+    productions: Tuple of the productions in conflict.
+'''
+Conflict = namedtuple('Conflict', [ 'kind', 'non_terminal', 'terminal', 'productions' ])
+
+
+class LL1Table(object):
+    '''
+    Predictive parse table of a grammar.
+
+    The table is a dense int array with a row per non terminal and a column
+    per terminal: entry `row * len(terminals) + column` is the index in
+    `productions` of the production to expand, or -1. The rows are the non
+    terminals in sorted order and the columns are FINISH followed by the
+    terminals, in the order of the bits of `Grammar.bitsets`, whose first and
+    follow masks give the columns of each production directly.
+
+    When several productions go in the same entry the first one, in sorted
+    order, is kept, and all of them are reported in `conflicts`. The report
+    is only put together the first time it is read.
+
+    Attributes:
+        non_terminals: List with the non terminal of each row.
+        terminals: List with the terminal of each column.
+        productions: Sorted list of the productions in the table.
+        table: The dense array.
+        conflicts: List of `Conflict`, by row and column.
+    '''
+
+    def __init__(self, grammar):
+        super(LL1Table, self).__init__()
+        bitsets = grammar.bitsets()
+
+        self.non_terminals = sorted(grammar.non_terminals)
+        self._rows = { s: i for i, s in enumerate(self.non_terminals) }
+        # Bit 0 is EPSILON, which is never a column
+        self.terminals = bitsets.symbols[1:]
+        self._columns = { s: i for i, s in enumerate(self.terminals) }
+
+        self.productions = sorted(
+            Prod(n, tuple(p))
+            for n, p in grammar.productions
+            if n in self._rows)
+
+        width = len(self.terminals)
+        self.table = array('i', [ -1 ]) * (len(self.non_terminals) * width)
+        self._conflicts = None
+
+        # Entries filled by a production because of the follow set
+        followed = set()
+        # Entries with more than one production, with the productions that
+        # got there by their first set and the ones by the follow set
+        self._clashes = clashes = {}
+        epsilon = bitsets.bit(EPSILON)
+
+        for index, (non_term, prod) in enumerate(self.productions):
+            base = self._rows[non_term] * width
+            first = bitsets.first_of(prod)
+            follow = 0
+            if first & epsilon:
+                first &= ~epsilon
+                follow = bitsets.follow.get(non_term, 0) & ~first
+
+            for mask, by_follow in ((first, False), (follow, True)):
+                while mask:
+                    low = mask & -mask
+                    mask ^= low
+                    entry = base + low.bit_length() - 2
+
+                    if self.table[entry] == -1:
+                        self.table[entry] = index
+                        if by_follow:
+                            followed.add(entry)
+                        continue
+
+                    if entry not in clashes:
+                        clashes[entry] = ([], [])
+                        kept = self.table[entry]
+                        clashes[entry][entry in followed].append(kept)
+                    clashes[entry][by_follow].append(index)
+
+    @property
+    def conflicts(self):
+        if self._conflicts is None:
+            self._conflicts = []
+            for entry, (by_first, by_follow) in sorted(self._clashes.items()):
+                self._add_conflicts(entry, by_first, by_follow)
+        return self._conflicts
+
+    def _add_conflicts(self, entry, by_first, by_follow):
+        row, column = divmod(entry, len(self.terminals))
+        non_terminal = self.non_terminals[row]
+        terminal = self.terminals[column]
+
+        def conflict(kind, indexes):
+            prods = tuple(self.productions[i] for i in sorted(indexes))
+            self._conflicts.append(
+                Conflict(kind, non_terminal, terminal, prods))
+
+        if len(by_first) > 1:
+            conflict('FIRST/FIRST', by_first)
+        # Several productions deriving EPSILON
+        if len(by_follow) > 1:
+            conflict('FIRST/FIRST', by_follow)
+        if by_first and by_follow:
+            conflict('FIRST/FOLLOW', by_first + by_follow)
+
+    def get(self, non_terminal, terminal):
+        '''
+        Gets the production to expand the non terminal with when the next
+        terminal is `terminal`, or None if it is a syntax error.
+        '''
+        row = self._rows.get(non_terminal)
+        column = self._columns.get(terminal)
+        if row is None or column is None:
+            return None
+
+        index = self.table[row * len(self.terminals) + column]
+        return self.productions[index] if index != -1 else None
+
+    def entries(self):
+        '''
+        Yields the (non terminal, terminal, production) of each entry that is
+        not empty.
+        '''
+        width = len(self.terminals)
+        for entry, index in enumerate(self.table):
+            if index != -1:
+                row, column = divmod(entry, width)
+                yield (
+                    self.non_terminals[row],
+                    self.terminals[column],
+                    self.productions[index])
+
+    def is_ll1(self):
+        '''
+        Checks if the grammar is LL(1), that is, if the table has no
+        conflicts.
+        '''
+        return not self._clashes
@@ -0,0 +1,125 @@
+'''
+Reads grammars written in the text format of the interface, one non terminal
+per line:
+
+    S -> a S | b A
+    A -> c | &
+
+The first line gives the start symbol. Symbols are separated by spaces, non
+terminals are an upper case letter followed by digits and every other symbol
+is a terminal.
+
+Lines are read one at a time, so a file is never held in memory as a whole.
+'''
+import re
+
+from grammar.grammar import Grammar
+from grammar.production import Prod, ProductionSet
+
+NON_TERMINAL_RE = re.compile(r'[A-Z][\d]*')
+
+
+class GrammarSyntaxError(ValueError):
+    '''
+    Error in the text of a grammar.
+
+    Attributes:
+        line: Number of the line with the error, starting at 1, or None if
+            the error is not in a single line.
+    '''
+
+    def __init__(self, message, line=None):
+        if line is not None:
+            message = f'line {line}: {message}'
+        super(GrammarSyntaxError, self).__init__(message)
+        self.line = line
+
+
+def is_non_terminal(symbol):
+    '''
+    Checks if the symbol is a valid non terminal.
+    '''
+    return NON_TERMINAL_RE.match(symbol) is not None
+
+
+def read_rules(lines):
+    '''
+    Yields, for each non empty line, its number, its non terminal and the
+    list of its bodies, as tuples of symbols.
+
+    Raises `GrammarSyntaxError` on the first invalid line.
+    '''
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        non_terminal, arrow, expressions = line.partition('->')
+        if not arrow:
+            raise GrammarSyntaxError('expected "->"', number)
+        if '->' in expressions:
+            raise GrammarSyntaxError('more than one "->"', number)
+
+        non_terminal = non_terminal.strip()
+        if not is_non_terminal(non_terminal):
+            raise GrammarSyntaxError(
+                f'invalid non-terminal: "{non_terminal}"', number)
+
+        bodies = []
+        for expression in expressions.split('|'):
+            body = tuple(expression.split())
+            if Grammar.FINISH in body:
+                raise GrammarSyntaxError(
+                    f'invalid symbol "{Grammar.FINISH}"', number)
+            if body:
+                bodies.append(body)
+
+        yield number, non_terminal, bodies
+
+
+def load(lines, productions=ProductionSet):
+    '''
+    Reads a grammar from an iterable of lines, like an open file.
+
+    `productions` is the class of the production set of the grammar, e.g.
+    `CompactProductionSet` for very large grammars. Raises
+    `GrammarSyntaxError` if the text is invalid.
+    '''
+    grammar = Grammar(set(), set(), productions(), None)
+    non_terminals = grammar.non_terminals
+    terminals = grammar.terminals
+    add = grammar.productions.add
+    # Symbols already classified, so each one is only matched once
+    seen = set()
+
+    for _, non_terminal, bodies in read_rules(lines):
+        if grammar.start is None:
+            grammar.start = non_terminal
+        non_terminals.add(non_terminal)
+
+        for body in bodies:
+            for symbol in body:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    if not is_non_terminal(symbol):
+                        terminals.add(symbol)
+            add(Prod(non_terminal, body))
+
+    if grammar.start is None:
+        raise GrammarSyntaxError('empty grammar')
+    return grammar
+
+
+def loads(text, productions=ProductionSet):
+    '''
+    Reads a grammar from a string, see `load`.
+    '''
+    return load(text.splitlines(), productions)
+
+
+def load_file(path, productions=ProductionSet, encoding='utf-8'):
+    '''
+    Reads a grammar from a file, see `load`.
+    '''
+    with open(path, encoding=encoding) as file:
+        return load(file, productions)
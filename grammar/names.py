@@ -0,0 +1,37 @@
+class NameAllocator(object):
+    '''
+    Generates new symbol names made of a base name and a counter, like A0,
+    A1, ...
+
+    The base of a name is the name without its trailing digits, so names
+    generated from A, A0 or A12 share the base A, while Expr gives Expr0.
+    Each base keeps the counter of its last generated name and only moves it
+    forward, skipping names already in use, so generating n names takes O(n)
+    in total.
+    '''
+
+    def __init__(self):
+        super(NameAllocator, self).__init__()
+        self._counters = {}
+
+    def copy(self):
+        copy = NameAllocator()
+        copy._counters = dict(self._counters)
+        return copy
+
+    @staticmethod
+    def base(name):
+        return name.rstrip('0123456789') or name
+
+    def fresh(self, name, *taken):
+        '''
+        Gets a name with the base of `name` that is in none of the `taken`
+        sets. The name is not reserved until it is added to one of them.
+        '''
+        base = self.base(name)
+        counter = self._counters.get(base, 0)
+        while any(f'{base}{counter}' in t for t in taken):
+            counter += 1
+
+        self._counters[base] = counter
+        return f'{base}{counter}'
@@ -1,4 +1,7 @@
 from collections import namedtuple
+from collections.abc import MutableSet
+
+from grammar.digest import MODULUS, digest, digest_all
 
 '''
 Simple named tuple class to be used as productions in this implementation.
@@ -8,3 +11,188 @@ Attributes:
     p: Production from the n symbol.
 '''
 Prod = namedtuple('Prod', [ 'n', 'p' ])
+
+
+class ProductionSet(MutableSet):
+    '''
+    Set of productions indexed by their non terminal symbol.
+
+    It behaves like the plain set of `Prod` used before, but the productions
+    are stored grouped by head, so getting the productions of a single non
+    terminal does not need to go through the whole set. It also keeps, for
+    each symbol, the productions where it occurs.
+
+    `copy` shares the storage between both sets until one of them changes.
+    Then the changed set copies the dicts of the indexes, which only hold
+    references, and the index entries it touches.
+
+    Attributes:
+        version: Counter incremented every time the set changes.
+    '''
+
+    def __init__(self, productions=()):
+        super(ProductionSet, self).__init__()
+        self._heads = {}
+        self._occurrences = {}
+        # Entries of the indexes that may be changed in place, None when the
+        # storage was never shared
+        self._shared = False
+        self._owned = None
+        self._size = 0
+        self.version = 0
+        # Only kept up to date after `digest` is first called
+        self._digest = None
+        self.update(productions)
+
+    def add(self, prod):
+        if not isinstance(prod, Prod):
+            prod = Prod(*prod)
+
+        if prod in self._heads.get(prod.n, ()):
+            return
+
+        self._write('_heads', prod.n).add(prod)
+        self._size += 1
+        self.version += 1
+        self._update_digest(prod, 1)
+
+        for symbol in { prod.n, *prod.p }:
+            self._write('_occurrences', symbol).add(prod)
+
+    def discard(self, prod):
+        non_terminal, production = prod
+        if prod not in self._heads.get(non_terminal, ()):
+            return
+
+        prods = self._write('_heads', non_terminal)
+        prods.discard(prod)
+        self._size -= 1
+        self.version += 1
+        self._update_digest(prod, -1)
+        if not prods:
+            del self._heads[non_terminal]
+
+        for symbol in { non_terminal, *production }:
+            occurrences = self._write('_occurrences', symbol)
+            occurrences.discard(prod)
+            if not occurrences:
+                del self._occurrences[symbol]
+
+    def _write(self, name, key):
+        '''
+        Gets the set of an entry of the `_heads` or `_occurrences` index,
+        owned by this production set so it can be changed. The entry is
+        created if needed.
+        '''
+        if self._shared:
+            self._heads = dict(self._heads)
+            self._occurrences = dict(self._occurrences)
+            self._shared = False
+
+        index = getattr(self, name)
+        values = index.get(key)
+        if values is None:
+            values = index[key] = set()
+        elif self._owned is not None and (name, key) not in self._owned:
+            values = index[key] = set(values)
+        else:
+            return values
+
+        if self._owned is not None:
+            self._owned.add((name, key))
+        return values
+
+    def digest(self):
+        '''
+        Gets the order independent digest of the productions, see
+        `grammar.digest`.
+        '''
+        if self._digest is None:
+            self._digest = digest_all((n, tuple(p)) for n, p in self)
+        return self._digest
+
+    def _update_digest(self, prod, sign):
+        '''
+        Adds (sign 1) or subtracts (sign -1) the digest of a production that
+        was just added or removed.
+        '''
+        if self._digest is not None:
+            non_terminal, production = prod
+            change = sign * digest((non_terminal, tuple(production)))
+            self._digest = (self._digest + change) % MODULUS
+
+    def bodies(self, non_terminal):
+        '''
+        Returns a new set with the bodies of the productions of the non
+        terminal.
+        '''
+        return { p.p for p in self._heads.get(non_terminal, ()) }
+
+    def occurrences(self, symbol):
+        '''
+        Returns a new set with the productions where the symbol is the head
+        or is part of the body.
+        '''
+        return set(self._occurrences.get(symbol, ()))
+
+    def heads(self):
+        '''
+        Returns the symbols that have at least one production.
+        '''
+        return self._heads.keys()
+
+    def update(self, productions):
+        for prod in productions:
+            self.add(prod)
+
+    def difference_update(self, productions):
+        for prod in productions:
+            self.discard(prod)
+
+    def copy(self):
+        '''
+        Returns a copy that shares the storage of this set until one of them
+        changes, so it takes constant time.
+        '''
+        copy = type(self).__new__(type(self))
+        copy.__dict__.update(self.__dict__)
+        copy._owned = set()
+        self._owned = set()
+        copy._shared = self._shared = True
+        return copy
+
+    def difference(self, other):
+        return set(self).difference(other)
+
+    def union(self, other):
+        return set(self).union(other)
+
+    def intersection(self, other):
+        return set(self).intersection(other)
+
+    def issubset(self, other):
+        return set(self).issubset(other)
+
+    def issuperset(self, other):
+        return set(self).issuperset(other)
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def __contains__(self, prod):
+        try:
+            non_terminal, _ = prod
+        except (TypeError, ValueError):
+            return False
+        return prod in self._heads.get(non_terminal, ())
+
+    def __iter__(self):
+        for prods in self._heads.values():
+            yield from prods
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return f'{type(self).__name__}({set(self)!r})'
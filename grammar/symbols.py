@@ -0,0 +1,101 @@
+from grammar.digest import MODULUS, digest, digest_all
+
+
+class SymbolSet(set):
+    '''
+    Set of symbols that counts its changes.
+
+    It is a plain set in every other way, so it can be compared and combined
+    with other sets as before.
+
+    Attributes:
+        version: Counter incremented every time the set changes.
+    '''
+
+    def __init__(self, symbols=()):
+        super(SymbolSet, self).__init__(symbols)
+        self.version = 0
+        # Only kept up to date after `digest` is first called
+        self._digest = None
+
+    def digest(self):
+        '''
+        Gets the order independent digest of the symbols, see
+        `grammar.digest`.
+        '''
+        if self._digest is None:
+            self._digest = digest_all(self)
+        return self._digest
+
+    def copy(self):
+        copy = SymbolSet(self)
+        copy.version = self.version
+        copy._digest = self._digest
+        return copy
+
+    def add(self, symbol):
+        if symbol not in self:
+            self._change((symbol,), ())
+
+    def discard(self, symbol):
+        if symbol in self:
+            self._change((), (symbol,))
+
+    def remove(self, symbol):
+        if symbol not in self:
+            raise KeyError(symbol)
+        self._change((), (symbol,))
+
+    def pop(self):
+        if not self:
+            raise KeyError('pop from an empty set')
+        symbol = next(iter(self))
+        self._change((), (symbol,))
+        return symbol
+
+    def clear(self):
+        self._change((), set(self))
+
+    def update(self, *others):
+        self._change(set().union(*others).difference(self), ())
+
+    def difference_update(self, *others):
+        self._change((), self.intersection(set().union(*others)))
+
+    def intersection_update(self, *others):
+        self._change((), self.difference(self.intersection(*others)))
+
+    def symmetric_difference_update(self, other):
+        other = set(other)
+        self._change(other.difference(self), other.intersection(self))
+
+    def _change(self, added, removed):
+        '''
+        Adds and removes symbols, the added ones not being in the set and the
+        removed ones being in it.
+        '''
+        if not added and not removed:
+            return
+
+        super(SymbolSet, self).update(added)
+        super(SymbolSet, self).difference_update(removed)
+        self.version += 1
+        if self._digest is not None:
+            change = sum(map(digest, added)) - sum(map(digest, removed))
+            self._digest = (self._digest + change) % MODULUS
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
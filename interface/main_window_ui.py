@@ -1,18 +1,11 @@
-import re
-
-from copy import deepcopy
 from functools import wraps
-from collections import OrderedDict
 
 from interface.layout import Ui_MainWindow
 from PyQt5.QtWidgets import QMainWindow, QListWidgetItem
 from PyQt5.QtCore import Qt
 
-from grammar import Grammar, Prod
-
-SPACE_REMOVE_RE = re.compile(r' +')
-NON_TERMINAL_RE = re.compile(r'[A-Z][\d]*')
-# TERMINAL_RE = re.compile(r'[a-z\d\+\{\}\!\@\#\$\%\*\(\)\;\?\:\.\,\_\-]+')
+from grammar import Grammar
+from grammar.loader import GrammarSyntaxError, loads
 
 
 class MainWindow(QMainWindow, Ui_MainWindow):
@@ -87,53 +80,14 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         @wraps(fun)
         def wrapped(self, *args, **kwargs):
             try:
-                table = self._get_grammar_input()
-            except Exception as e:
-                self.log('Invalid grammar')
+                self._to_grammar()
+            except GrammarSyntaxError as e:
+                self.log(f'Invalid grammar: {e}')
                 return
 
-            # Check non-terminals
-            for non_terminal in table.keys():
-                if not re.match(NON_TERMINAL_RE, non_terminal):
-                    self.log(f'Invalid non-terminal: "{non_terminal}"')
-                    return
-
-            # Check for $
-            for value in table.values():
-                for prod in value:
-                    if Grammar.FINISH in prod:
-                        self.log('Invalid symbol "$" in grammar')
-                        return
-
             return fun(self)
         return wrapped
 
-    def _valid_symbol(self, symbol):
-        return re.match(NON_TERMINAL_RE, symbol) or re.match(TERMINAL_RE, symbol)
-
-    def _get_grammar_input(self):
-        text = self.textEditGrammarInput.toPlainText()
-        text = re.sub(SPACE_REMOVE_RE, ' ', text)
-
-        table = OrderedDict()
-
-        lines = text.split('\n')
-
-        for line in lines:
-            if line == '':
-                continue
-            line = line.strip()
-            non_terminal, expressions = line.split('->')
-            non_terminal = non_terminal.strip()
-            table[non_terminal] = []
-            for exp in expressions.split('|'):
-                exp = exp.strip().split()
-                exp = filter(lambda i: i != '', exp)
-                exp = tuple(exp)
-                if len(exp) > 0:
-                    table[non_terminal].append(exp)
-        return table
-
     def _save_grammar(self, name, grammar):
         item = QListWidgetItem(name)
         item.setData(Qt.UserRole, grammar)
@@ -180,8 +134,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     @has_grammar
     def _ne(self):
-        ne = self.selected_grammar._epsilon_closure()
-        ne = { i[0] for i in ne }
+        ne = set(self.selected_grammar.nullable())
         self.log(f'Epsilon closure:\t{ne}')
 
     @has_grammar
@@ -207,7 +160,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     @has_grammar
     def _remove_direct_recursion(self):
-        grammar = deepcopy(self.selected_grammar)
+        grammar = self.selected_grammar.copy()
         grammar_name = f'{self.lineInputGrammarName.text()}_direct'
 
         for nt in grammar._get_direct_left():
@@ -227,7 +180,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     @has_grammar
     def _remove_indirect_recursion(self):
-        grammar = deepcopy(self.selected_grammar)
+        grammar = self.selected_grammar.copy()
         grammar_name = f'{self.lineInputGrammarName.text()}_indirect'
 
         grammar.remove_left_recursion()
@@ -241,19 +194,19 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         grammar_name = self.selected_grammar_name
 
         # Create grammars
-        epsilon_free = deepcopy(self.selected_grammar)
+        epsilon_free = self.selected_grammar.copy()
         epsilon_free.remove_epsilon()
         epsilon_free_name = f'{grammar_name}_epsilon_free'
 
-        simple_free = deepcopy(epsilon_free)
+        simple_free = epsilon_free.copy()
         simple_free.remove_simple()
         simple_free_name = f'{grammar_name}_simple_free'
 
-        unproductive_free = deepcopy(simple_free)
+        unproductive_free = simple_free.copy()
         unproductive_free.remove_unproductive()
         unproductive_free_name = f'{grammar_name}_unproductive_free'
 
-        unreachable_free = deepcopy(unproductive_free)
+        unreachable_free = unproductive_free.copy()
         unreachable_free.remove_unreachable()
         unreachable_free_name = f'{grammar_name}_unreachable_free'
 
@@ -297,28 +250,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.textEditGrammarInput.setText(str(grammar))
 
     def _to_grammar(self):
-        table = self._get_grammar_input()
-
-        terminals = set()
-        productions = set()
-        non_terminals = set(table.keys())
-
-        # Start
-        start = next(iter(table))
-
-        # Terminal
-        for prods in table.values():
-            for prod in prods:
-                for symbol in prod:
-                    if not re.match(NON_TERMINAL_RE, symbol):
-                        terminals.add(symbol)
-
-        # Productions
-        for nt, prods in table.items():
-            for exp in prods:
-                productions.add(Prod(nt, exp))
-
-        return Grammar(non_terminals, terminals, productions, start)
+        return loads(self.textEditGrammarInput.toPlainText())
 
     def log(self, text):
         self.textEditConsole.append(text)
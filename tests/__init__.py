@@ -1,4 +1,5 @@
-from tests.test_production import TestProduction
+from tests.test_production import TestProduction, TestProductionSet, \
+    TestCompactProductionSet
 from tests.test_simple import TestSimple
 from tests.test_grammar import TestGrammar
 from tests.test_first_sequence import TestFirstSequence
@@ -6,3 +7,13 @@ from tests.test_get_next_nt import TestGetNextNT
 from tests.test_factors import TestFactors
 from tests.test_finite import TestFinite
 from tests.test_recursion import TestRecursion
+from tests.test_graph import TestGraph
+from tests.test_cache import TestCache, TestDiskCache
+from tests.test_incremental import TestIncremental
+from tests.test_bitset import TestBitset
+from tests.test_snapshot import TestSnapshot
+from tests.test_fingerprint import TestFingerprint
+from tests.test_loader import TestLoader
+from tests.test_binary import TestBinary
+from tests.test_cli import TestCli
+from tests.test_ll1 import TestLL1
@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+import unittest
+
+from grammar import CompactProductionSet, Grammar, Prod, binary
+from grammar.loader import loads
+
+TEXT = '''
+S -> a S1 b | B | &
+S1 -> S | c
+B -> b B | ñ
+'''
+
+class TestBinary(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'grammar.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameGrammar(self, loaded, grammar):
+        self.assertEqual(loaded.start, grammar.start)
+        self.assertSetEqual(loaded.non_terminals, grammar.non_terminals)
+        self.assertSetEqual(loaded.terminals, grammar.terminals)
+        self.assertSetEqual(set(loaded.productions), set(grammar.productions))
+        self.assertEqual(loaded.fingerprint(), grammar.fingerprint())
+
+    def test_round_trip(self):
+        grammar = loads(TEXT)
+        for index in (True, False):
+            grammar.save_binary(self.path, index)
+            loaded = Grammar.load_binary(self.path)
+            self.assertIsInstance(loaded.productions, CompactProductionSet)
+            self.assertSameGrammar(loaded, grammar)
+            self.assertSetEqual(loaded['S'], grammar['S'])
+            self.assertSetEqual(loaded.occurrences('B'), grammar.occurrences('B'))
+            self.assertDictEqual(loaded.first_sets(), grammar.first_sets())
+            self.assertSetEqual(
+                set(loads(str(loaded)).productions),
+                set(grammar.productions))
+
+    def test_change_loaded(self):
+        grammar = loads(TEXT)
+        grammar.save_binary(self.path)
+
+        loaded = Grammar.load_binary(self.path)
+        loaded.add_production('B', ('d',))
+        loaded.remove_production('S', ('B',))
+        self.assertIn(Prod('B', ('d',)), loaded.productions)
+        self.assertNotIn(Prod('S', ('B',)), loaded.productions)
+
+        # The file is mapped read only, it does not change
+        self.assertSameGrammar(Grammar.load_binary(self.path), grammar)
+
+    def test_empty(self):
+        grammar = Grammar(set(), set(), set(), None)
+        grammar.save_binary(self.path)
+        self.assertSameGrammar(Grammar.load_binary(self.path), grammar)
+
+    def test_deterministic(self):
+        first = io.BytesIO()
+        second = io.BytesIO()
+        grammar = loads(TEXT)
+        other = Grammar(
+            list(grammar.non_terminals)[::-1],
+            grammar.terminals,
+            list(grammar.productions)[::-1],
+            grammar.start)
+        binary.save(first, grammar.non_terminals, grammar.terminals,
+            grammar.productions, grammar.start)
+        binary.save(second, other.non_terminals, other.terminals,
+            other.productions, other.start)
+        self.assertEqual(first.getvalue(), second.getvalue())
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'S -> a' * 10)
+        with self.assertRaises(ValueError):
+            Grammar.load_binary(self.path)
+
+        loads(TEXT).save_binary(self.path)
+        with open(self.path, 'r+b') as file:
+            file.seek(4)
+            file.write(bytes([ binary.VERSION + 1 ]))
+        with self.assertRaises(ValueError):
+            Grammar.load_binary(self.path)
+
+        loads(TEXT).save_binary(self.path)
+        with open(self.path, 'r+b') as file:
+            file.truncate(64)
+        with self.assertRaises(ValueError):
+            Grammar.load_binary(self.path)
+
+        grammar = Grammar({ 'S' }, { 'a\0' }, set(), 'S')
+        with self.assertRaises(ValueError):
+            grammar.save_binary(self.path)
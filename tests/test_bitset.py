@@ -0,0 +1,53 @@
+import unittest
+
+from grammar import Grammar, Prod
+
+class TestBitset(unittest.TestCase):
+    def setUp(self):
+        non_terminals = set('SABC')
+        terminals = set('abcd')
+        productions = {
+            Prod('S', ('A', 'B', 'C')),
+            Prod('A', ('a', 'A')),
+            Prod('A', (Grammar.EPSILON,)),
+            Prod('B', ('b', 'B')),
+            Prod('B', ('A', 'C', 'd')),
+            Prod('C', ('c', 'C')),
+            Prod('C', (Grammar.EPSILON,))
+        }
+        start = 'S'
+        self.grammar = Grammar(non_terminals, terminals, productions, start)
+
+    def test_first(self):
+        bitsets = self.grammar.bitsets()
+        self.assertDictEqual(bitsets.first_sets(), self.grammar.first_sets())
+        self.assertEqual(bitsets.first['B'], bitsets.mask('abcd'))
+
+    def test_follow(self):
+        bitsets = self.grammar.bitsets()
+        self.assertDictEqual(bitsets.follow_sets(), self.grammar.follow_sets())
+        self.assertEqual(bitsets.follow['S'], bitsets.mask(Grammar.FINISH))
+
+    def test_follow_undeclared_head(self):
+        productions = [ Prod('S', ('a', 'D')), Prod('D', ('S',)) ]
+        for prods in (productions, productions[::-1]):
+            grammar = Grammar(set('S'), set('a'), prods, 'S')
+            bitsets = grammar.bitsets()
+            self.assertDictEqual(bitsets.follow_sets(), grammar.follow_sets())
+            self.assertDictEqual(bitsets.follow_sets(), {
+                'S': {'$'},
+                'D': {'$'}
+            })
+
+    def test_first_of(self):
+        bitsets = self.grammar.bitsets()
+        for sequence in [ ('A', 'C'), ('A', 'B'), ('C', 'd'), () ]:
+            self.assertSetEqual(
+                bitsets.to_set(bitsets.first_of(sequence)),
+                set(self.grammar.first_of(sequence)))
+
+    def test_to_set(self):
+        bitsets = self.grammar.bitsets()
+        mask = bitsets.mask({ 'a', 'c', Grammar.EPSILON })
+        self.assertSetEqual(bitsets.to_set(mask), { 'a', 'c', Grammar.EPSILON })
+        self.assertSetEqual(bitsets.to_set(0), set())
@@ -0,0 +1,197 @@
+import os
+import tempfile
+import unittest
+
+from copy import deepcopy
+
+from grammar import DiskCache, Grammar, Prod
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        non_terminals = set('SA')
+        terminals = set('ab')
+        productions = {
+            Prod('S', ('A', 'b')),
+            Prod('A', ('a', 'A')),
+            Prod('A', (Grammar.EPSILON,))
+        }
+        start = 'S'
+        self.grammar = Grammar(non_terminals, terminals, productions, start)
+
+    def test_hits(self):
+        first = self.grammar.first_sets()
+        hits, misses, _ = self.grammar.cache_info()
+
+        self.assertDictEqual(self.grammar.first_sets(), first)
+        info = self.grammar.cache_info()
+        self.assertEqual(info.hits, hits + 1)
+        self.assertEqual(info.misses, misses)
+
+    def test_arguments(self):
+        reachable = self.grammar.reachable('S')
+        self.grammar._first()
+        misses = self.grammar.cache_info().misses
+
+        self.assertSetEqual(self.grammar.reachable(symbol='S'), reachable)
+        self.grammar._first(True)
+        self.grammar._first(non_terminals=True)
+        self.assertEqual(self.grammar.cache_info().misses, misses)
+
+        with self.assertRaises(TypeError):
+            self.grammar.reachable()
+
+    def test_result_is_copy(self):
+        follow = self.grammar.follow_sets()
+        follow['S'].add('x')
+        productive = self.grammar.productive()
+        productive.add('x')
+
+        self.assertSetEqual(self.grammar.follow_sets()['S'], { '$' })
+        self.assertSetEqual(self.grammar.productive(), set('SA'))
+
+    def test_add_production(self):
+        self.assertSetEqual(self.grammar.first_sets()['S'], { 'a', 'b' })
+
+        self.grammar.add_production('A', ('c',))
+        self.grammar.terminals.add('c')
+
+        self.assertSetEqual(self.grammar.first_sets()['S'], set('abc'))
+
+    def test_direct_mutation(self):
+        version = self.grammar.version
+        self.assertSetEqual(self.grammar.reachable('S'), set('SAab&'))
+
+        self.grammar.productions.discard(Prod('S', ('A', 'b')))
+        self.assertGreater(self.grammar.version, version)
+        self.assertSetEqual(self.grammar.reachable('S'), set('S'))
+
+        version = self.grammar.version
+        self.grammar.productions = { Prod('S', ('b',)) }
+        self.assertGreater(self.grammar.version, version)
+        self.assertSetEqual(self.grammar.reachable('S'), set('Sb'))
+
+    def test_symbols_and_start(self):
+        self.assertFalse(self.grammar.is_empty())
+
+        version = self.grammar.version
+        self.grammar.non_terminals.add('S')
+        self.assertEqual(self.grammar.version, version)
+
+        self.grammar.terminals -= { 'b' }
+        self.assertGreater(self.grammar.version, version)
+        self.assertTrue(self.grammar.is_empty())
+
+        version = self.grammar.version
+        self.grammar.start = 'A'
+        self.assertGreater(self.grammar.version, version)
+        self.assertFalse(self.grammar.is_empty())
+
+    def test_copy(self):
+        self.grammar.first_sets()
+        grammar = deepcopy(self.grammar)
+
+        self.assertEqual(grammar.cache_info().size, 0)
+        self.assertEqual(grammar, self.grammar)
+        self.assertDictEqual(grammar.first_sets(), self.grammar.first_sets())
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'cache', 'analysis.db')
+        self.cache = DiskCache(path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def grammar(self):
+        productions = {
+            Prod('S', ('A', 'b')),
+            Prod('A', ('a', 'A')),
+            Prod('A', (Grammar.EPSILON,))
+        }
+        grammar = Grammar(set('SA'), set('ab'), productions, 'S')
+        grammar.disk_cache = self.cache
+        return grammar
+
+    def test_shared_between_grammars(self):
+        first = self.grammar().first_sets()
+        cycle = self.grammar().infinite_cycle()
+
+        misses = self.cache.misses
+        grammar = self.grammar()
+        self.assertDictEqual(grammar.first_sets(), first)
+        self.assertEqual(grammar.infinite_cycle(), cycle)
+        self.assertEqual(self.cache.misses, misses)
+        self.assertGreater(self.cache.hits, 0)
+
+    def test_keyed_by_content(self):
+        self.grammar().first_sets()
+
+        grammar = self.grammar()
+        grammar.add_production('S', ('c',))
+        grammar.terminals.add('c')
+        hits = self.cache.hits
+        self.assertSetEqual(grammar.first_sets()['S'], set('abc'))
+        self.assertEqual(self.cache.hits, hits)
+
+    def test_forged_fingerprint(self):
+        # Grammars whose fingerprints collide must not share results
+        self.grammar().first_sets()
+
+        grammar = self.grammar()
+        grammar.add_production('S', ('c',))
+        grammar.terminals.add('c')
+        grammar.fingerprint = self.grammar().fingerprint
+        self.assertSetEqual(grammar.first_sets()['S'], set('abc'))
+
+    def test_locked(self):
+        self.cache['a'] = 1
+        cache = DiskCache(self.cache.path, timeout=0.01)
+        # Another process holding the write lock does not turn a read into
+        # a miss
+        self.cache._connect().execute('BEGIN IMMEDIATE')
+        try:
+            self.assertEqual(cache['a'], 1)
+            self.assertEqual(cache.hits, 1)
+        finally:
+            self.cache._connect().execute('ROLLBACK')
+            cache.close()
+
+    def test_infinite_cycle_intermediate(self):
+        grammar = self.grammar()
+        grammar.infinite_cycle()
+        digest = grammar.content_digest()
+
+        keys = self.cache._connect().execute('SELECT key FROM results')
+        keys = [ key for key, in keys ]
+        self.assertTrue(keys)
+        for key in keys:
+            self.assertTrue(key.endswith(digest), key)
+
+    def test_eviction(self):
+        self.cache.max_size = 3100
+        value = 'x' * 1000
+        for key in 'abc':
+            self.cache[key] = value
+        self.assertEqual(self.cache['a'], value)
+
+        self.cache['d'] = value
+        self.assertLessEqual(self.cache.size(), 3100)
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('d', self.cache)
+
+        with self.assertRaises(KeyError):
+            self.cache['b']
+
+    def test_reopen(self):
+        self.cache['a'] = { 'S': { 'a' } }
+        self.cache.close()
+
+        cache = DiskCache(self.cache.path)
+        self.assertDictEqual(cache['a'], { 'S': { 'a' } })
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        cache.close()
@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from grammar import cli
+from grammar.loader import loads
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        grammars = {
+            'finite.txt': 'S -> a A | b\nA -> c',
+            'infinite.txt': 'S -> a S | b',
+            'invalid.txt': 's -> a',
+        }
+        for name, text in grammars.items():
+            with open(os.path.join(self.directory.name, name), 'w') as file:
+                file.write(text)
+        loads('S -> S a | &').save_binary(
+            os.path.join(self.directory.name, 'recursive.bin'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_cli(self, *argv, stdin=None):
+        stdout = io.StringIO()
+        status = cli.main(list(argv), stdin=stdin, stdout=stdout)
+        records = [ json.loads(l) for l in stdout.getvalue().splitlines() ]
+        return status, { r['name']: r for r in records }
+
+    def test_directory(self):
+        status, records = self.run_cli(
+            self.directory.name, '-o', 'finite', '-o', 'empty', '-j', '0')
+        self.assertEqual(status, 1)
+        self.assertEqual(len(records), 4)
+        self.assertDictEqual(
+            records['finite.txt']['results'],
+            { 'finite': True, 'empty': False })
+        self.assertFalse(records['infinite.txt']['results']['finite'])
+        self.assertFalse(records['recursive.bin']['results']['empty'])
+        self.assertIn('line 1', records['invalid.txt']['error'])
+
+    def test_json_lines(self):
+        stdin = io.StringIO(
+            '{"name": "g", "grammar": "S -> a A\\nA -> b | &"}\n'
+            '\n'
+            '{"grammar": "S -> S a | b"}\n')
+        status, records = self.run_cli('-', '-j', '0', stdin=stdin)
+        self.assertEqual(status, 0)
+        self.assertSetEqual(set(records), { 'g', '3' })
+
+        results = records['g']['results']
+        self.assertSetEqual(set(results), set(cli.OPERATIONS))
+        self.assertDictEqual(results['follow'], { 'S': [ '$' ], 'A': [ '$' ] })
+        self.assertListEqual(results['first']['A'], [ '&', 'b' ])
+        self.assertTrue(results['factor']['factored'])
+
+        recursive = loads(records['3']['results']['remove-left-recursion'])
+        self.assertFalse(recursive.has_left_recursion())
+
+    def test_process_pool(self):
+        status, records = self.run_cli(
+            self.directory.name, '-o', 'first', '-j', '2', '-c', '2')
+        self.assertEqual(status, 1)
+        self.assertEqual(len(records), 4)
+        self.assertSetEqual(
+            { r['index'] for r in records.values() },
+            { 0, 1, 2, 3 })
+        self.assertListEqual(
+            records['finite.txt']['results']['first']['S'],
+            [ 'a', 'b' ])
+
+    def test_no_qt(self):
+        code = (
+            'import sys, grammar.cli\n'
+            'sys.exit("PyQt5" in sys.modules)\n'
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([ sys.executable, '-c', code ], check=True, cwd=root)
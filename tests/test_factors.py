@@ -56,6 +56,41 @@ class TestFactors(unittest.TestCase):
             frozen_exp = set(map(lambda s: frozenset(s), exp))
             self.assertSetEqual(frozen_res, frozen_exp)
 
+    def test_get_factors_non_terminal(self):
+        # The bodies share no terminal, only the non terminal C that may
+        # begin both of them
+        productions = set([
+            Prod('S', ('B', 'C')),
+            Prod('S', ('C',)),
+            Prod('S', ('a',)),
+            Prod('B', (Grammar.EPSILON,)),
+            Prod('C', ('C', 'b'))
+        ])
+        grammar = Grammar(set('SBC'), set('ab'), productions, 'S')
+
+        res = grammar._get_factors('S')
+        frozen_res = set(map(lambda s: frozenset(s), res))
+        self.assertSetEqual(frozen_res, {
+            frozenset({ ('B', 'C'), ('C',) }),
+            frozenset({ ('a',) })
+        })
+
+    def test_is_factored_non_terminal(self):
+        # Both bodies may begin with C, so they are grouped by _get_factors
+        productions = set([
+            Prod('S', ('B', 'C', 'a')),
+            Prod('S', ('C', 'b')),
+            Prod('B', (Grammar.EPSILON,)),
+            Prod('C', (Grammar.EPSILON,))
+        ])
+        grammar = Grammar(set('SBC'), set('ab'), productions, 'S')
+
+        self.assertFalse(grammar.is_factored())
+        self.assertListEqual(
+            grammar._get_factors('S'),
+            [{ ('B', 'C', 'a'), ('C', 'b') }])
+        self.assertFalse(grammar.factor(1))
+
     def test_factor(self):
         exp_non_terminals = { 'S', 'S0', 'B' }
         exp_terminals = set('abd')
@@ -151,3 +186,78 @@ class TestFactors(unittest.TestCase):
 
         result = grammar.factor(10)
         self.assertFalse(result)
+
+    def test_left_factor(self):
+        non_terminals = { 'S', 'S0', 'B', 'B0' }
+        terminals = set('abd')
+        productions = {
+            Prod('S', ('a','S0')),
+            Prod('S', ('d','S')),
+            Prod('S0', ('B',)),
+            Prod('S0', ('S',)),
+            Prod('B', ('b','B0')),
+            Prod('B0', ('B',)),
+            Prod('B0', (Grammar.EPSILON,)),
+        }
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        result = self.grammar.left_factor()
+
+        self.assertEqual(self.grammar, grammar)
+        self.assertEqual(result.rounds, 1)
+        self.assertSetEqual(set(result.new_symbols), { 'S0', 'B0' })
+        self.assertTrue(result.factored)
+
+    def test_left_factor_expand(self):
+        non_terminals = set('SA')
+        terminals = set('abc')
+        productions = {
+            Prod('S', ('A', 'b')),
+            Prod('S', ('a', 'c')),
+            Prod('A', ('a',)),
+        }
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        result = grammar.left_factor()
+
+        self.assertTrue(result.factored)
+        self.assertSetEqual(grammar['S'], { ('a', 'S0') })
+        self.assertSetEqual(grammar['S0'], { ('b',), ('c',) })
+
+    def test_left_factor_prefixes(self):
+        non_terminals = { 'S' }
+        terminals = set('abc')
+        productions = {
+            Prod('S', ('a', 'b', 'c')),
+            Prod('S', ('a', 'b')),
+            Prod('S', ('a', 'c')),
+            Prod('S', ('b',)),
+        }
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        result = grammar.left_factor()
+
+        self.assertEqual(result.rounds, 1)
+        self.assertEqual(result.new_symbols, [ 'S0', 'S1' ])
+        self.assertSetEqual(grammar['S'], { ('a', 'S0'), ('b',) })
+        self.assertSetEqual(grammar['S0'], { ('b', 'S1'), ('c',) })
+        self.assertSetEqual(grammar['S1'], { ('c',), (Grammar.EPSILON,) })
+
+    def test_left_factor_loop(self):
+        non_terminals = set('AS')
+        terminals = set('ac')
+        productions = {
+            Prod('S', ('a','S')),
+            Prod('S', ('A',)),
+            Prod('A', ('a', 'A', 'c')),
+            Prod('A', (Grammar.EPSILON,))
+        }
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        result = grammar.left_factor(5)
+        self.assertEqual(result.rounds, 5)
+        self.assertFalse(result.factored)
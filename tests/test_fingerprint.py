@@ -0,0 +1,89 @@
+import unittest
+
+from grammar import CompactProductionSet, Grammar, Prod, ProductionSet
+from grammar.symbols import SymbolSet
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        non_terminals = set('SA')
+        terminals = set('ab')
+        productions = {
+            Prod('S', ('A', 'b')),
+            Prod('A', ('a', 'A')),
+            Prod('A', (Grammar.EPSILON,))
+        }
+        start = 'S'
+        self.grammar = Grammar(non_terminals, terminals, productions, start)
+
+    def test_order_independent(self):
+        productions = list(self.grammar.productions)
+        other = Grammar(list('AS'), list('ba'), reversed(productions), 'S')
+        self.assertEqual(self.grammar.fingerprint(), other.fingerprint())
+        self.assertEqual(hash(self.grammar), hash(other))
+        self.assertEqual(self.grammar, other)
+
+    def test_incremental(self):
+        fingerprint = self.grammar.fingerprint()
+
+        self.grammar.add_production('A', ('b',))
+        self.grammar.non_terminals.add('B')
+        changed = self.grammar.fingerprint()
+        self.assertNotEqual(changed, fingerprint)
+
+        # Same as computing it from scratch
+        other = Grammar(
+            self.grammar.non_terminals,
+            self.grammar.terminals,
+            self.grammar.productions,
+            self.grammar.start)
+        self.assertEqual(other.fingerprint(), changed)
+
+        self.grammar.remove_production('A', ('b',))
+        self.grammar.non_terminals -= { 'B' }
+        self.assertEqual(self.grammar.fingerprint(), fingerprint)
+
+    def test_start(self):
+        other = self.grammar.copy()
+        other.start = 'A'
+        self.assertNotEqual(self.grammar.fingerprint(), other.fingerprint())
+        self.assertNotEqual(self.grammar, other)
+
+    def test_content_digest(self):
+        productions = list(self.grammar.productions)
+        other = Grammar(list('AS'), list('ba'), reversed(productions), 'S')
+        digest = self.grammar.content_digest()
+        self.assertEqual(other.content_digest(), digest)
+
+        other.add_production('A', ('b',))
+        self.assertNotEqual(other.content_digest(), digest)
+        other.remove_production('A', ('b',))
+        self.assertEqual(other.content_digest(), digest)
+
+        # Moving a symbol between sets changes the digest
+        other.non_terminals.discard('A')
+        other.terminals.add('A')
+        self.assertNotEqual(other.content_digest(), digest)
+
+    def test_symbol_set(self):
+        symbols = SymbolSet('abc')
+        digest = symbols.digest()
+
+        symbols |= { 'd', 'e' }
+        symbols ^= { 'a', 'f' }
+        symbols.intersection_update('bcdef')
+        symbols.pop()
+        symbols.clear()
+        symbols.update('abc')
+        self.assertEqual(symbols.digest(), digest)
+
+    def test_production_sets(self):
+        prods = [ Prod('S', ('a', 'S')), Prod('S', ('b',)), Prod('A', ()) ]
+        for cls in (ProductionSet, CompactProductionSet):
+            store = cls(prods)
+            digest = store.digest()
+            copy = store.copy()
+            copy.discard(Prod('S', ('b',)))
+            self.assertNotEqual(copy.digest(), digest)
+            copy.add(('S', ('b',)))
+            self.assertEqual(copy.digest(), digest)
+            self.assertEqual(store.digest(), ProductionSet(prods).digest())
@@ -51,3 +51,34 @@ class TestFinite(unittest.TestCase):
         result = grammar.is_finite()
 
         self.assertFalse(result)
+
+    def test_is_finite_shared_symbol(self):
+        non_terminals = set('SAB')
+        terminals = set('ab')
+        productions = {
+            Prod('S', ('A', 'A')),
+            Prod('A', ('B', 'a')),
+            Prod('A', ('B', 'b')),
+            Prod('B', ('b',))
+        }
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        self.assertTrue(grammar.is_finite())
+        self.assertIsNone(grammar.infinite_cycle())
+
+    def test_infinite_cycle(self):
+        non_terminals = set('SAB')
+        terminals = set('ab')
+        productions = {
+            Prod('S', ('a', 'A')),
+            Prod('A', ('b', 'B')),
+            Prod('A', ('b',)),
+            Prod('B', ('a', 'A'))
+        }
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        result = grammar.infinite_cycle()
+
+        self.assertIn(result, { ('A', 'B'), ('B', 'A') })
@@ -46,3 +46,37 @@ class TestFirstSequence(unittest.TestCase):
         for test, exp in zip(tests, expected):
             res = self.grammar._first_sequence(first, test) - non_term
             self.assertSetEqual(res, exp)
+
+    def test_first_of(self):
+        tests = [
+            ('B', 'C'),
+            ('A', 'B'),
+            ('A', 'A'),
+            ('A', 'c'),
+            (Grammar.EPSILON,),
+            ()
+        ]
+        expected = [
+            { 'd', 'b' },
+            { 'a', 'd', 'b' },
+            { 'a', Grammar.EPSILON },
+            { 'a', 'c' },
+            { Grammar.EPSILON },
+            { Grammar.EPSILON }
+        ]
+
+        for test, exp in zip(tests, expected):
+            res = self.grammar.first_of(test)
+            self.assertSetEqual(res, exp)
+
+        # Memoized
+        res = self.grammar.first_of(('A', 'B'))
+        self.assertIs(self.grammar.first_of(('A', 'B')), res)
+
+    def test_first_of_changes(self):
+        self.assertSetEqual(self.grammar.first_of(('S',)), { 'a', 'b', 'd' })
+
+        self.grammar.add_production('A', ('c',))
+        self.assertSetEqual(
+            self.grammar.first_of(('S',)),
+            { 'a', 'b', 'c', 'd' })
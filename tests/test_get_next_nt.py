@@ -33,3 +33,21 @@ class TestGetNextNT(unittest.TestCase):
             res = self.grammar._get_next_nt(test)
             print(test, res)
             self.assertEqual(res, exp)
+
+    def test_base_name(self):
+        self.grammar.non_terminals.add('Expr')
+        self.assertEqual(self.grammar._get_next_nt('Expr'), 'Expr0')
+        self.assertEqual(self.grammar._get_next_nt('A1'), 'A3')
+        self.assertEqual(self.grammar._get_next_nt('B67'), 'B0')
+
+    def test_reserved(self):
+        names = set()
+        for _ in range(1000):
+            name = self.grammar._get_next_nt('B')
+            self.assertNotIn(name, self.grammar.non_terminals)
+            self.grammar.non_terminals.add(name)
+            names.add(name)
+
+        self.assertEqual(len(names), 1000)
+        self.assertNotIn('B67', names)
+        self.assertIn('B1001', names)
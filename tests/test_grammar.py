@@ -288,6 +288,38 @@ class TestGrammar(unittest.TestCase):
 
         self.assertEqual(grammar, exp_grammar)
 
+    def test_remove_epsilon_binarize(self):
+        non_terminals = set('SA')
+        terminals = set('ab')
+        productions = set([
+            Prod('S', ('a', 'A', 'A', 'b')),
+            Prod('A', ('a',)),
+            Prod('A', (Grammar.EPSILON,))
+        ])
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+        grammar.remove_epsilon(binarize=True)
+
+
+        exp_non_terminals = { 'S', 'S0', 'S1', 'A' }
+        exp_terminals = set('ab')
+        exp_productions = set([
+            Prod('S', ('a', 'S1')),
+            Prod('S1', ('A', 'S0')),
+            Prod('S1', ('S0',)),
+            Prod('S0', ('A', 'b')),
+            Prod('S0', ('b',)),
+            Prod('A', ('a',))
+        ])
+        exp_start = 'S'
+        exp_grammar = Grammar(
+            exp_non_terminals,
+            exp_terminals,
+            exp_productions,
+            exp_start)
+
+        self.assertEqual(grammar, exp_grammar)
+
     def test_productive(self):
         non_terminals = set('SABCD')
         terminals = set('abcd')
@@ -312,6 +344,21 @@ class TestGrammar(unittest.TestCase):
 
         self.assertSetEqual(result, expected)
 
+    def test_productive_chain(self):
+        size = 500
+        non_terminals = { f'A{i}' for i in range(size) }
+        terminals = set('ab')
+        productions = { Prod(f'A{i}', (f'A{i + 1}', 'a')) for i in range(size - 1) }
+        productions.add(Prod(f'A{size - 1}', ('b',)))
+        productions.add(Prod('A0', ('A0', 'B')))
+        start = 'A0'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        result = grammar.productive()
+
+        self.assertSetEqual(result, non_terminals)
+        self.assertFalse(grammar.is_empty())
+
     def test_reachable(self):
         non_terminals = set('SABCD')
         terminals = set('abcd')
@@ -338,6 +385,18 @@ class TestGrammar(unittest.TestCase):
 
         self.assertSetEqual(result, expected)
 
+        result = grammar.reachable('A')
+        expected = set('ABCDabcd')
+
+        self.assertSetEqual(result, expected)
+
+        # The graph must follow changes to the productions
+        grammar.add_production('D', ('A',))
+        result = grammar.reachable(start)
+        expected = set('SABCDabcd')
+
+        self.assertSetEqual(result, expected)
+
     def test_is_empty_false(self):
         '''
         Test example got from here:
@@ -427,6 +486,26 @@ class TestGrammar(unittest.TestCase):
 
         self.assertSetEqual(result, expected)
 
+    def test_nullable(self):
+        non_terminals = set('SABC')
+        terminals = set('ab')
+        productions = set([
+            Prod('S', ('A', 'B')),
+            Prod('S', ('C', 'a')),
+            Prod('A', ('B', 'B')),
+            Prod('B', ('b', 'B')),
+            Prod('B', (Grammar.EPSILON,)),
+            Prod('C', ('C', 'A')),
+        ])
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        result = grammar.nullable()
+        expected = frozenset('SAB')
+
+        self.assertIsInstance(result, frozenset)
+        self.assertSetEqual(result, expected)
+
     def test_symbol_simple(self):
         non_terminals = set('SFGH')
         terminals = set('abcd')
@@ -524,6 +603,35 @@ class TestGrammar(unittest.TestCase):
         }
         self.assertDictEqual(first, exp_first)
 
+    def test_first_cycle(self):
+        non_terminals = set('AB')
+        terminals = set('abc')
+        productions = set([
+            Prod('A', ('B','a')),
+            Prod('A', ('c',)),
+            Prod('B', ('A','b')),
+            Prod('B', (Grammar.EPSILON,)),
+        ])
+        start = 'A'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+
+        first = grammar.first_sets()
+        exp_first = {
+            'a': {'a'},
+            'b': {'b'},
+            'c': {'c'},
+            'A': {'a', 'c'},
+            'B': {'a', 'c', '&'}
+        }
+        self.assertDictEqual(first, exp_first)
+
+        first_NT = grammar.first_NT()
+        exp_first_NT = {
+            'A': {'A', 'B'},
+            'B': {'A', 'B'}
+        }
+        self.assertDictEqual(first_NT, exp_first_NT)
+
     def test_follow(self):
         non_terminals = set('SABC')
         terminals = set('abcd')
@@ -632,6 +740,37 @@ class TestGrammar(unittest.TestCase):
         }
         self.assertDictEqual(follow, exp_follow)
 
+    def test_follow_unreachable(self):
+        non_terminals = set('SAB')
+        terminals = set('ab')
+        productions = set([
+            Prod('S', ('a','S')),
+            Prod('S', ('a',)),
+            Prod('A', ('A','b')),
+            Prod('A', ('B',)),
+            Prod('B', ('b',)),
+        ])
+        start = 'S'
+        grammar = Grammar(non_terminals, terminals, productions, start)
+        follow = grammar.follow_sets()
+        exp_follow = {
+            'S': {'$'},
+            'A': {'b'},
+            'B': {'b'}
+        }
+        self.assertDictEqual(follow, exp_follow)
+
+    def test_follow_undeclared_head(self):
+        # D has productions and is used, but is not a declared non terminal,
+        # the result must not depend on the order of the productions
+        productions = [ Prod('S', ('a', 'D')), Prod('D', ('S',)) ]
+        for prods in (productions, productions[::-1]):
+            grammar = Grammar(set('S'), set('a'), prods, 'S')
+            self.assertDictEqual(grammar.follow_sets(), {
+                'S': {'$'},
+                'D': {'$'}
+            })
+
     def test_first_NT(self):
         non_terminals = set('SABC')
         terminals = set('abcd')
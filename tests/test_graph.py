@@ -0,0 +1,56 @@
+import unittest
+
+from grammar.graph import find_cycle, strongly_connected_components
+
+class TestGraph(unittest.TestCase):
+
+    def test_components(self):
+        graph = {
+            'S': { 'A', 'B' },
+            'A': { 'B' },
+            'B': { 'C' },
+            'C': { 'A', 'd' },
+        }
+
+        result = list(strongly_connected_components(graph))
+        result = [ set(c) for c in result ]
+
+        self.assertIn(set('ABC'), result)
+        self.assertIn(set('S'), result)
+        self.assertIn(set('d'), result)
+        self.assertEqual(len(result), 3)
+
+    def test_reverse_topological_order(self):
+        graph = {
+            'S': { 'A' },
+            'A': { 'B' },
+            'B': { 'C' },
+        }
+
+        result = list(strongly_connected_components(graph))
+
+        self.assertListEqual(result, [ ['C'], ['B'], ['A'], ['S'] ])
+
+    def test_deep_graph(self):
+        size = 10000
+        graph = { i: { i + 1 } for i in range(size) }
+        graph[size] = { 0 }
+
+        result = list(strongly_connected_components(graph))
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(len(result[0]), size + 1)
+
+    def test_find_cycle(self):
+        graph = {
+            'S': { 'A' },
+            'A': { 'B', 'S' },
+            'B': { 'C' },
+            'C': { 'A' },
+        }
+
+        self.assertEqual(find_cycle(graph, 'S'), [ 'S', 'A' ])
+        self.assertEqual(find_cycle(graph, 'B'), [ 'B', 'C', 'A' ])
+        self.assertEqual(find_cycle(graph, 'A', set('ABC')), [ 'A', 'B', 'C' ])
+        self.assertIsNone(find_cycle(graph, 'A', set('A')))
+        self.assertIsNone(find_cycle(graph, 'D'))
@@ -0,0 +1,106 @@
+import random
+import unittest
+
+from grammar import Grammar, Prod
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        self.rand = random.Random(1994)
+
+    def _random_body(self, symbols):
+        if self.rand.random() < 0.15:
+            return (Grammar.EPSILON,)
+        length = self.rand.randint(1, 4)
+        return tuple(self.rand.choice(symbols) for _ in range(length))
+
+    def _recomputed(self, grammar):
+        full = Grammar(
+            set(grammar.non_terminals),
+            set(grammar.terminals),
+            set(grammar.productions),
+            grammar.start)
+        return full.nullable(), full.first_sets(), full.follow_sets()
+
+    def _assert_up_to_date(self, grammar):
+        nullable, first, follow = self._recomputed(grammar)
+        self.assertSetEqual(set(grammar.nullable()), set(nullable))
+        self.assertDictEqual(grammar.first_sets(), first)
+        self.assertDictEqual(grammar.follow_sets(), follow)
+
+    def test_random_edits(self):
+        for _ in range(10):
+            non_terminals = [ f'A{i}' for i in range(6) ]
+            terminals = [ f't{i}' for i in range(4) ]
+            symbols = non_terminals + terminals
+            productions = {
+                Prod(self.rand.choice(non_terminals), self._random_body(symbols))
+                for _ in range(12)
+            }
+            grammar = Grammar(
+                set(non_terminals), set(terminals), productions, 'A0')
+            grammar.incremental = True
+            self._assert_up_to_date(grammar)
+
+            for step in range(60):
+                action = self.rand.random()
+                if action < 0.5 or not grammar.productions:
+                    non_term = self.rand.choice(non_terminals)
+                    grammar.add_production(non_term, self._random_body(symbols))
+                elif action < 0.9:
+                    prod = self.rand.choice(list(grammar.productions))
+                    grammar.remove_production(*prod)
+                elif action < 0.95:
+                    symbol = f'B{step}'
+                    grammar.non_terminals.add(symbol)
+                    non_terminals.append(symbol)
+                    symbols.append(symbol)
+                elif len(non_terminals) > 1:
+                    symbol = self.rand.choice(non_terminals[1:])
+                    grammar.remove_non_terminal(symbol)
+                    non_terminals.remove(symbol)
+                    symbols.remove(symbol)
+
+                self._assert_up_to_date(grammar)
+
+    def test_edits_are_incremental(self):
+        grammar = Grammar(
+            set('SA'),
+            set('ab'),
+            {
+                Prod('S', ('A', 'b')),
+                Prod('A', ('a', 'A')),
+            },
+            'S')
+        grammar.incremental = True
+        grammar.follow_sets()
+        analysis = grammar._incremental
+
+        grammar.add_production('A', (Grammar.EPSILON,))
+        self.assertSetEqual(grammar.first_sets()['S'], { 'a', 'b' })
+        grammar.remove_production('A', (Grammar.EPSILON,))
+        self.assertSetEqual(grammar.first_sets()['S'], { 'a' })
+        self.assertIs(grammar._incremental, analysis)
+
+        # Changes made directly to the sets are not tracked
+        grammar.productions.add(Prod('S', ('b',)))
+        self.assertSetEqual(grammar.first_sets()['S'], { 'a', 'b' })
+        self.assertIsNot(grammar._incremental, analysis)
+
+    def test_undeclared_head(self):
+        # X has productions but is not declared, they are not used by either
+        # engine
+        productions = {
+            Prod('S', ('X', 'a')),
+            Prod('S', ('X',)),
+            Prod('X', (Grammar.EPSILON,)),
+        }
+        for incremental in (False, True):
+            grammar = Grammar(set('S'), set('a'), productions, 'S')
+            grammar.incremental = incremental
+            self.assertSetEqual(set(grammar.nullable()), set())
+            self.assertDictEqual(
+                grammar.first_sets(),
+                { 'S': { 'X' }, 'a': { 'a' } })
+            self.assertDictEqual(
+                grammar.follow_sets(),
+                { 'S': { '$' }, 'X': { 'a', '$' } })
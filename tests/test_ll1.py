@@ -0,0 +1,98 @@
+import unittest
+
+from grammar import Grammar, Prod
+from grammar.loader import loads
+
+class TestLL1(unittest.TestCase):
+    def test_expressions(self):
+        grammar = loads('''
+            E -> T E1
+            E1 -> + T E1 | &
+            T -> F T1
+            T1 -> * F T1 | &
+            F -> ( E ) | id
+        ''')
+        table = grammar.ll1_table()
+
+        self.assertTrue(table.is_ll1())
+        self.assertEqual(table.get('E', 'id'), Prod('E', ('T', 'E1')))
+        self.assertEqual(table.get('E', '('), Prod('E', ('T', 'E1')))
+        self.assertEqual(table.get('E1', '+'), Prod('E1', ('+', 'T', 'E1')))
+        self.assertEqual(table.get('E1', ')'), Prod('E1', ('&',)))
+        self.assertEqual(table.get('E1', '$'), Prod('E1', ('&',)))
+        self.assertEqual(table.get('T1', '+'), Prod('T1', ('&',)))
+        self.assertEqual(table.get('F', 'id'), Prod('F', ('id',)))
+        self.assertIsNone(table.get('E', '+'))
+        self.assertIsNone(table.get('E', 'x'))
+        self.assertIsNone(table.get('X', 'id'))
+        self.assertEqual(len(list(table.entries())), 13)
+
+        # The table is indexed by ids
+        width = len(table.terminals)
+        row = table.non_terminals.index('T1')
+        column = table.terminals.index('*')
+        prod = table.productions[table.table[row * width + column]]
+        self.assertEqual(prod, Prod('T1', ('*', 'F', 'T1')))
+
+    def test_first_first(self):
+        grammar = loads('S -> S a | b | b c')
+        conflicts = grammar.ll1_table().conflicts
+
+        self.assertFalse(grammar.ll1_table().is_ll1())
+        self.assertEqual(len(conflicts), 1)
+        kind, non_terminal, terminal, prods = conflicts[0]
+        self.assertEqual(kind, 'FIRST/FIRST')
+        self.assertEqual((non_terminal, terminal), ('S', 'b'))
+        self.assertSetEqual(set(prods), {
+            Prod('S', ('S', 'a')),
+            Prod('S', ('b',)),
+            Prod('S', ('b', 'c'))
+        })
+
+    def test_first_follow(self):
+        # Dangling else
+        grammar = loads('''
+            S -> i S E | a
+            E -> e S | &
+        ''')
+        conflicts = grammar.ll1_table().conflicts
+
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0].kind, 'FIRST/FOLLOW')
+        self.assertEqual(conflicts[0].non_terminal, 'E')
+        self.assertEqual(conflicts[0].terminal, 'e')
+        self.assertSetEqual(
+            set(conflicts[0].productions),
+            { Prod('E', ('e', 'S')), Prod('E', ('&',)) })
+
+    def test_nullable_alternatives(self):
+        grammar = loads('''
+            S -> A b | B b
+            A -> &
+            B -> &
+        ''')
+        kinds = { (c.non_terminal, c.terminal, c.kind)
+            for c in grammar.ll1_table().conflicts }
+        self.assertSetEqual(kinds, { ('S', 'b', 'FIRST/FIRST') })
+
+    def test_undeclared_head(self):
+        # D has productions and is used, but is not a declared non terminal,
+        # so it has no row
+        productions = [ Prod('S', ('a', 'D')), Prod('D', ('S',)) ]
+        for prods in (productions, productions[::-1]):
+            grammar = Grammar(set('S'), set('a'), prods, 'S')
+            table = grammar.ll1_table()
+            self.assertTrue(table.is_ll1())
+            self.assertListEqual(table.non_terminals, [ 'S' ])
+            self.assertEqual(table.get('S', 'a'), Prod('S', ('a', 'D')))
+            self.assertIsNone(table.get('D', 'a'))
+
+    def test_rebuilt_on_change(self):
+        grammar = loads('S -> a S | b')
+        self.assertTrue(grammar.ll1_table().is_ll1())
+
+        grammar.add_production('S', ('a',))
+        self.assertFalse(grammar.ll1_table().is_ll1())
+
+        grammar.left_factor()
+        self.assertTrue(grammar.ll1_table().is_ll1())
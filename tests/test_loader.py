@@ -0,0 +1,64 @@
+import io
+import unittest
+
+from grammar import CompactProductionSet, Prod
+from grammar.loader import GrammarSyntaxError, load, load_file, loads
+
+class TestLoader(unittest.TestCase):
+    def test_loads(self):
+        grammar = loads('''
+            S ->  a S |b A|
+            A -> c | &
+        ''')
+        self.assertEqual(grammar.start, 'S')
+        self.assertSetEqual(grammar.non_terminals, set('SA'))
+        self.assertSetEqual(grammar.terminals, set('abc&'))
+        self.assertSetEqual(set(grammar.productions), {
+            Prod('S', ('a', 'S')),
+            Prod('S', ('b', 'A')),
+            Prod('A', ('c',)),
+            Prod('A', ('&',))
+        })
+
+    def test_round_trip(self):
+        text = 'S -> a S1 b | B\nS1 -> S | &\nB -> b B | b'
+        grammar = loads(text)
+        again = loads(str(grammar))
+        self.assertEqual(again.start, grammar.start)
+        self.assertSetEqual(set(again.productions), set(grammar.productions))
+
+    def test_stream(self):
+        def lines():
+            yield 'S -> A0 b\n'
+            for i in range(1000):
+                yield f'A{i} -> a A{i + 1} | b\n'
+
+        grammar = load(lines(), CompactProductionSet)
+        self.assertIsInstance(grammar.productions, CompactProductionSet)
+        self.assertEqual(len(grammar.productions), 2001)
+        self.assertEqual(len(grammar.non_terminals), 1001)
+        self.assertSetEqual(grammar['A999'], { ('a', 'A1000'), ('b',) })
+
+    def test_file(self):
+        grammar = load(io.StringIO('S -> a | b\n'))
+        self.assertSetEqual(grammar['S'], { ('a',), ('b',) })
+        with self.assertRaises(FileNotFoundError):
+            load_file('/nonexistent/grammar.txt')
+
+    def test_errors(self):
+        cases = [
+            ('S -> a\n\nA a', 3),
+            ('S -> a -> b', 1),
+            ('S -> a\ns -> b', 2),
+            ('S -> a $', 1),
+            (' -> a', 1),
+        ]
+        for text, line in cases:
+            with self.assertRaises(GrammarSyntaxError) as context:
+                loads(text)
+            self.assertEqual(context.exception.line, line)
+            self.assertTrue(str(context.exception).startswith(f'line {line}:'))
+
+        with self.assertRaises(GrammarSyntaxError) as context:
+            loads('\n  \n')
+        self.assertIsNone(context.exception.line)
@@ -1,6 +1,7 @@
+import pickle
 import unittest
 
-from grammar import Prod
+from grammar import CompactProductionSet, Grammar, Prod, ProductionSet
 
 class TestProduction(unittest.TestCase):
 
@@ -8,3 +9,121 @@ class TestProduction(unittest.TestCase):
         p = Prod('A', 'b')
         self.assertEqual(p.n, 'A')
         self.assertEqual(p.p, 'b')
+
+
+class TestProductionSet(unittest.TestCase):
+    def setUp(self):
+        self.productions = ProductionSet([
+            Prod('S', ('a', 'S')),
+            Prod('S', ('A',)),
+            Prod('A', ('b',))
+        ])
+
+    def test_bodies(self):
+        self.assertSetEqual(self.productions.bodies('S'), { ('a', 'S'), ('A',) })
+        self.assertSetEqual(self.productions.bodies('A'), { ('b',) })
+        self.assertSetEqual(self.productions.bodies('B'), set())
+
+    def test_add_discard(self):
+        self.productions.add(('A', ('c',)))
+        self.productions.add(Prod('A', ('c',)))
+        self.assertEqual(len(self.productions), 4)
+        self.assertIn(Prod('A', ('c',)), self.productions)
+
+        self.productions.discard(('S', ('A',)))
+        self.productions.discard(('S', ('A',)))
+        self.assertEqual(len(self.productions), 3)
+        self.assertSetEqual(self.productions.bodies('S'), { ('a', 'S') })
+
+        self.productions.discard(('A', ('b',)))
+        self.productions.discard(('A', ('c',)))
+        self.assertNotIn('A', self.productions.heads())
+
+    def test_set_equal(self):
+        expected = {
+            Prod('S', ('a', 'S')),
+            Prod('S', ('A',)),
+            Prod('A', ('b',))
+        }
+        self.assertSetEqual(self.productions, expected)
+        self.assertEqual(expected, self.productions)
+
+    def test_occurrences(self):
+        self.assertSetEqual(
+            self.productions.occurrences('S'),
+            { Prod('S', ('a', 'S')), Prod('S', ('A',)) })
+        self.assertSetEqual(
+            self.productions.occurrences('A'),
+            { Prod('S', ('A',)), Prod('A', ('b',)) })
+
+        self.productions.discard(('S', ('A',)))
+        self.assertSetEqual(
+            self.productions.occurrences('A'),
+            { Prod('A', ('b',)) })
+        self.assertSetEqual(self.productions.occurrences('c'), set())
+
+    def test_wide_head(self):
+        bodies = { ('a', str(i)) for i in range(2000) }
+        for body in bodies:
+            self.productions.add(Prod('W', body))
+        removed = { ('a', str(i)) for i in range(0, 2000, 2) }
+        for body in removed:
+            self.productions.discard(Prod('W', body))
+        self.productions.add(Prod('W', ('a', '0')))
+
+        expected = bodies - removed | { ('a', '0') }
+        self.assertSetEqual(self.productions.bodies('W'), expected)
+        self.assertEqual(len(self.productions), 3 + len(expected))
+        self.assertIn(Prod('W', ('a', '0')), self.productions)
+        self.assertNotIn(Prod('W', ('a', '2')), self.productions)
+        self.assertIn(Prod('W', ('a', '3')), self.productions)
+        expected = { Prod('W', body) for body in expected }
+        expected.add(Prod('S', ('a', 'S')))
+        self.assertSetEqual(self.productions.occurrences('a'), expected)
+
+
+class TestCompactProductionSet(TestProductionSet):
+    def setUp(self):
+        self.productions = CompactProductionSet([
+            Prod('S', ('a', 'S')),
+            Prod('S', ('A',)),
+            Prod('A', ('b',))
+        ])
+
+    def test_compact(self):
+        for i in range(10):
+            self.productions.add(Prod('B', ('b',) * i))
+        for i in range(10):
+            self.productions.discard(Prod('B', ('b',) * i))
+
+        self.assertLess(len(self.productions._prod_heads), 13)
+        self.assertSetEqual(self.productions.bodies('S'), { ('a', 'S'), ('A',) })
+        self.assertSetEqual(
+            self.productions.occurrences('b'),
+            { Prod('A', ('b',)) })
+
+    def test_copy_and_pickle(self):
+        self.productions.occurrences('S')
+        copy = self.productions.copy()
+        copy.discard(Prod('S', ('A',)))
+        copy.add(Prod('S', ('b',)))
+        self.assertIn(Prod('S', ('A',)), self.productions)
+        self.assertNotIn(Prod('S', ('b',)), self.productions)
+        self.assertSetEqual(
+            self.productions.occurrences('S'),
+            { Prod('S', ('a', 'S')), Prod('S', ('A',)) })
+
+        loaded = pickle.loads(pickle.dumps(copy))
+        self.assertSetEqual(loaded, copy)
+        self.assertIn(Prod('S', ('b',)), loaded)
+        loaded.add(Prod('S', ('b',)))
+        self.assertEqual(len(loaded), 3)
+
+    def test_grammar(self):
+        grammar = Grammar(set('SA'), set('ab'), self.productions, 'S')
+        self.assertIsInstance(grammar.productions, CompactProductionSet)
+        self.assertSetEqual(grammar.first_sets()['S'], { 'a', 'b' })
+
+        grammar.productions = { Prod('S', ('a',)) }
+        self.assertIsInstance(grammar.productions, CompactProductionSet)
+        self.assertSetEqual(grammar.first_sets()['S'], { 'a' })
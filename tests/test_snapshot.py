@@ -0,0 +1,83 @@
+import random
+import unittest
+
+from grammar import CompactProductionSet, Grammar, Prod, ProductionSet
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        non_terminals = set('SA')
+        terminals = set('ab')
+        productions = {
+            Prod('S', ('A', 'b')),
+            Prod('A', ('a', 'A')),
+            Prod('A', (Grammar.EPSILON,))
+        }
+        start = 'S'
+        self.grammar = Grammar(non_terminals, terminals, productions, start)
+
+    def test_independent(self):
+        snapshot = self.grammar.copy()
+        self.assertEqual(snapshot, self.grammar)
+
+        snapshot.add_production('A', ('b',))
+        snapshot.non_terminals.add('B')
+        self.assertNotIn(Prod('A', ('b',)), self.grammar.productions)
+        self.assertNotIn('B', self.grammar.non_terminals)
+
+        self.grammar.remove_production('S', ('A', 'b'))
+        self.assertIn(Prod('S', ('A', 'b')), snapshot.productions)
+        self.assertSetEqual(snapshot['A'], { ('a', 'A'), (Grammar.EPSILON,), ('b',) })
+        self.assertSetEqual(self.grammar['A'], { ('a', 'A'), (Grammar.EPSILON,) })
+        self.assertSetEqual(snapshot.occurrences('b'), {
+            Prod('S', ('A', 'b')), Prod('A', ('b',))
+        })
+        self.assertSetEqual(self.grammar.occurrences('b'), set())
+
+    def test_shares_storage(self):
+        productions = ProductionSet(self.grammar.productions)
+        snapshot = productions.copy()
+        self.assertIs(snapshot._heads, productions._heads)
+
+        snapshot.add(Prod('S', ('a',)))
+        self.assertIs(snapshot._heads['A'], productions._heads['A'])
+        self.assertIsNot(snapshot._heads['S'], productions._heads['S'])
+
+    def test_shares_cache(self):
+        first = self.grammar.first_sets()
+        snapshot = self.grammar.copy()
+
+        misses = snapshot.cache_info().misses
+        self.assertDictEqual(snapshot.first_sets(), first)
+        self.assertEqual(snapshot.cache_info().misses, misses)
+
+        snapshot.add_production('S', ('b',))
+        self.assertSetEqual(snapshot.first_sets()['S'], { 'a', 'b' })
+        self.assertDictEqual(self.grammar.first_sets(), first)
+
+    def test_random_edits(self):
+        rand = random.Random(2019)
+        for cls in (ProductionSet, CompactProductionSet):
+            symbols = [ 'S', 'A', 'a', 'b' ]
+            stores = [ cls() ]
+            expected = [ set() ]
+            for _ in range(300):
+                i = rand.randrange(len(stores))
+                prod = Prod(
+                    rand.choice('SA'),
+                    tuple(rand.choice(symbols) for _ in range(2)))
+                action = rand.random()
+                if action < 0.2:
+                    stores.append(stores[i].copy())
+                    expected.append(set(expected[i]))
+                elif action < 0.6:
+                    stores[i].add(prod)
+                    expected[i].add(prod)
+                else:
+                    stores[i].discard(prod)
+                    expected[i].discard(prod)
+
+                for store, exp in zip(stores, expected):
+                    self.assertSetEqual(set(store), exp)
+                    self.assertSetEqual(
+                        store.occurrences('a'),
+                        { p for p in exp if 'a' in p.p })